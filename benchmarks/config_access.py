@@ -0,0 +1,41 @@
+"""
+Time reading options of the loaded configuration and count the memory it allocates.
+Run from the repository root: python -m benchmarks.config_access
+"""
+import timeit
+import tracemalloc
+
+from config import config, lang, load_config
+
+ACCESSES = 1_000_000
+OPTIONS = {
+    "global option": lambda: config.language,
+    "section option": lambda: config.warm_start.cone,
+    "item access": lambda: config["warm_start"],
+    "language text": lambda: lang.info.preview
+}
+
+
+def allocated(read, count: int) -> int:
+    """Return number of bytes left allocated by reading the option count times"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(count):
+        read()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")
+               if stat.traceback[0].filename.endswith("config.py"))
+
+
+def main() -> None:
+    load_config()
+    print(f"{'option':>15} {'time [ns]':>10} {'allocated [B]':>14}")
+    for name, read in OPTIONS.items():
+        read()
+        duration = timeit.timeit(read, number = ACCESSES) / ACCESSES
+        print(f"{name:>15} {duration * 1e9:>10.1f} {allocated(read, 10_000):>14}")
+
+
+if __name__ == "__main__":
+    main()
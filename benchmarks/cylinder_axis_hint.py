@@ -0,0 +1,48 @@
+"""
+Check that cylinder axes constrained to a hint stay within the tolerance of it, also when the best axis lies outside.
+Run from the repository root: python -m benchmarks.cylinder_axis_hint
+"""
+import time
+
+import lsf
+from benchmarks import datasets
+from config import load_config
+
+SIZES = [2_000, 100_000]
+AXIS = (0.3, 0.5, 0.8)
+# Hinted axes and tolerances in degrees, the true axis lies outside all but the first cone
+HINTS = [
+    ((0.3, 0.5, 0.8), 2),
+    ((0.3, 0.55, 0.8), 0.5),
+    ((0, 0.2, 1), 5),
+    ((0, 0.2, 1), 3),
+    ((0, 0.05, 1), 1),
+    ((0.05, 0.05, 1), 1)
+]
+
+
+def main() -> None:
+    load_config()
+
+    print(f"{'points':>8} {'hint':>18} {'tolerance':>10} {'time [s]':>9} {'hint dev [deg]':>15} {'axis dev [deg]':>15} "
+          f"{'ok':>3}")
+    failures = 0
+    for size in SIZES:
+        points = datasets.cylinder_points(size, axis = AXIS, noise = 1e-5)
+        for hint, tolerance in HINTS:
+            start = time.perf_counter()
+            axis, *_ = lsf.fit_cylinder(points, axis = hint, axis_tolerance = tolerance)
+            elapsed = time.perf_counter() - start
+
+            hint_deviation = datasets.axis_deviation(axis, hint)
+            ok = hint_deviation <= tolerance * (1 + 1e-9)
+            failures += not ok
+            print(f"{size:>8} {str(hint):>18} {tolerance:>10} {elapsed:>9.3f} {hint_deviation:>15.4f} "
+                  f"{datasets.axis_deviation(axis, AXIS):>15.4f} {'yes' if ok else 'NO':>3}")
+
+    if failures:
+        raise SystemExit(f"{failures} axes lie outside the tolerance of their hint")
+
+
+if __name__ == "__main__":
+    main()
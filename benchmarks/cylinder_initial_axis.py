@@ -0,0 +1,45 @@
+"""
+Compare cylinder fitting scanning all axis directions with starting around the estimated axis.
+Run from the repository root: python -m benchmarks.cylinder_initial_axis
+"""
+import numpy as np
+
+import lsf
+from benchmarks import datasets, instrument
+from config import load_config
+
+SIZE = 20_000
+AXIS = (0.3, 0.5, 0.8)
+SHAPES = {
+    "long tube": {"length": 0.2},
+    "half tube": {"arc": np.pi},
+    "quarter arc": {"arc": np.pi / 2},
+    "20 deg arc": {"arc": np.radians(20)},
+    "ring": {"length": 0.002},
+    "noisy tube": {"noise": 1e-4}
+}
+
+
+def measure(points, estimate_axis: bool) -> tuple[int, float, float]:
+    """Fit cylinder and return number of evaluated axes, time and axis deviation in degrees"""
+    evaluations, elapsed, (axis, *_) = instrument.count_axis_evaluations(
+        lsf.fit_cylinder, points, multiresolution = False, estimate_axis = estimate_axis, tuned = False)
+    return evaluations, elapsed, datasets.axis_deviation(axis, AXIS)
+
+
+def main() -> None:
+    load_config()
+
+    print(f"{'shape':>12} {'scan evals':>11} {'scan [s]':>9} {'scan dev [deg]':>15} {'estimate evals':>15} "
+          f"{'estimate [s]':>13} {'estimate dev [deg]':>19}")
+    for name, shape in SHAPES.items():
+        points = datasets.cylinder_points(SIZE, axis = AXIS, **shape)
+        scan = measure(points, False)
+        estimate = measure(points, True)
+
+        print(f"{name:>12} {scan[0]:>11} {scan[1]:>9.3f} {scan[2]:>15.2e} {estimate[0]:>15} {estimate[1]:>13.3f} "
+              f"{estimate[2]:>19.2e}")
+
+
+if __name__ == "__main__":
+    main()
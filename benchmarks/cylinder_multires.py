@@ -0,0 +1,38 @@
+"""
+Compare cylinder fitting with and without the multiresolution search.
+Run from the repository root: python -m benchmarks.cylinder_multires
+"""
+import time
+
+import lsf
+from benchmarks import datasets
+from config import load_config
+
+SIZES = [10_000, 100_000, 1_000_000]
+AXIS = (0.3, 0.5, 0.8)
+
+
+def main() -> None:
+    load_config()
+
+    print(f"{'points':>10} {'full [s]':>10} {'multires [s]':>13} {'speedup':>8} {'full dev [deg]':>15} "
+          f"{'multires dev [deg]':>19}")
+    for size in SIZES:
+        points = datasets.cylinder_points(size, axis = AXIS)
+
+        start = time.perf_counter()
+        full_axis, *_ = lsf.fit_cylinder(points, multiresolution = False)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        multires_axis, *_ = lsf.fit_cylinder(points, multiresolution = True)
+        multires_time = time.perf_counter() - start
+
+        full_deviation = datasets.axis_deviation(full_axis, AXIS)
+        multires_deviation = datasets.axis_deviation(multires_axis, AXIS)
+        print(f"{size:>10} {full_time:>10.3f} {multires_time:>13.3f} {full_time / multires_time:>8.2f} "
+              f"{full_deviation:>15.2e} {multires_deviation:>19.2e}")
+
+
+if __name__ == "__main__":
+    main()
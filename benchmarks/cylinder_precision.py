@@ -0,0 +1,61 @@
+"""
+Compare the cylinder axis search in float64 with the mixed precision search ranking the axes of the coarse steps in
+float32, and check both find the same axis. Batched float64 search shows how much of the speedup comes from batching.
+Run from the repository root: python -m benchmarks.cylinder_precision
+"""
+import time
+import numpy as np
+
+from benchmarks import datasets
+from config import config, load_config
+from lsf import cylinder
+from lsf.pointset import PointSet
+
+SIZES = [1_000, 100_000]
+SEEDS = 3
+SHAPES = {
+    "tube": {},
+    "quarter arc": {"arc": np.pi / 2},
+    "noisy tube": {"noise": 1e-4},
+    "thin pin": {"radius": 0.001, "length": 0.01},
+    "large tube": {"radius": 1.0, "length": 3.0},
+    "far tube": {"origin": (10, 20, 30)},
+    "short ring": {"length": 0.005}
+}
+
+
+def timed_search(point_set: PointSet, dtype: None | type) -> tuple[float, np.ndarray]:
+    """Return time of searching all directions and the found axis, coarse steps are batched in dtype when given"""
+    coarse_fitter = None if dtype is None else cylinder.batch_fitter(point_set, dtype = dtype)
+    start = time.perf_counter()
+    *_, axis, _ = cylinder.search_axis(cylinder.axis_fitter(point_set), config.cylinder_angle_steps,
+                                       cylinder.FULL_SEARCH.region, coarse_fitter = coarse_fitter)
+    return time.perf_counter() - start, axis
+
+
+def main() -> None:
+    load_config()
+    tolerance = config.cylinder_angle_steps[-1]
+
+    print(f"float32 steps >= {config.precision.float32_step} deg, axes match within {tolerance} deg")
+    print(f"{'shape':>12} {'points':>8} {'float64 [s]':>12} {'batched [s]':>12} {'mixed [s]':>10} {'speedup':>8} "
+          f"{'max dev [deg]':>14} {'match':>6}")
+    for name, shape in SHAPES.items():
+        for size in SIZES:
+            timings = np.zeros(3)
+            deviation = 0.0
+            for seed in range(SEEDS):
+                point_set = PointSet(datasets.cylinder_points(size, seed = seed, **shape))
+                point_set.cylinder_moments
+                reference_time, reference = timed_search(point_set, None)
+                batched_time, _ = timed_search(point_set, np.float64)
+                mixed_time, axis = timed_search(point_set, np.float32)
+                timings += reference_time, batched_time, mixed_time
+                deviation = max(deviation, datasets.axis_deviation(axis, reference))
+
+            print(f"{name:>12} {size:>8} {timings[0]:>12.3f} {timings[1]:>12.3f} {timings[2]:>10.3f} "
+                  f"{timings[0] / timings[2]:>8.2f} {deviation:>14.2e} {'yes' if deviation <= tolerance else 'NO':>6}")
+
+
+if __name__ == "__main__":
+    main()
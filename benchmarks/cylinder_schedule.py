@@ -0,0 +1,46 @@
+"""
+Compare cylinder fitting with the fixed cylinder_angle_steps and with the tuned angle steps.
+Run from the repository root: python -m benchmarks.cylinder_schedule
+"""
+import numpy as np
+
+import lsf
+from benchmarks import datasets, instrument
+from config import load_config
+
+AXIS = (0.3, 0.5, 0.8)
+CASES = {
+    "tube": (2_000, {}),
+    "large tube": (200_000, {}),
+    "few points": (20, {}),
+    "half tube": (2_000, {"arc": np.pi}),
+    "quarter arc": (2_000, {"arc": np.pi / 2}),
+    "ring": (2_000, {"length": 0.002}),
+    "noisy tube": (2_000, {"noise": 1e-4}),
+    "very noisy": (2_000, {"noise": 1e-3})
+}
+
+
+def measure(points, tuned: bool) -> tuple[int, float, float, float]:
+    """Fit cylinder and return number of evaluated axes, time, axis deviation in degrees and RMS of the distances"""
+    evaluations, elapsed, (axis, *_, report) = instrument.count_axis_evaluations(
+        lsf.fit_cylinder, points, report = True, multiresolution = False, estimate_axis = False, tuned = tuned)
+    return evaluations, elapsed, datasets.axis_deviation(axis, AXIS), report.rms
+
+
+def main() -> None:
+    load_config()
+
+    print(f"{'case':>12} {'fixed evals':>12} {'fixed [s]':>10} {'fixed dev [deg]':>16} {'fixed rms':>10} "
+          f"{'tuned evals':>12} {'tuned [s]':>10} {'tuned dev [deg]':>16} {'tuned rms':>10}")
+    for name, (size, shape) in CASES.items():
+        points = datasets.cylinder_points(size, axis = AXIS, **shape)
+        fixed = measure(points, False)
+        tuned = measure(points, True)
+
+        print(f"{name:>12} {fixed[0]:>12} {fixed[1]:>10.3f} {fixed[2]:>16.2e} {fixed[3]:>10.2e} "
+              f"{tuned[0]:>12} {tuned[1]:>10.3f} {tuned[2]:>16.2e} {tuned[3]:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Compare cold cylinder refits after adding points to the selection with refits starting from the previous axis.
+Run from the repository root: python -m benchmarks.cylinder_warm_start
+"""
+import numpy as np
+
+import lsf
+from benchmarks import datasets, instrument
+from config import load_config
+
+SIZE = 2_000
+ADDED = [1, 10, 100, 1_000]
+AXIS = (0.3, 0.5, 0.8)
+SHAPES = {
+    "tube": {},
+    "quarter arc": {"arc": np.pi / 2},
+    "noisy tube": {"noise": 1e-4}
+}
+
+
+def main() -> None:
+    load_config()
+
+    print(f"{'shape':>12} {'added':>6} {'cold evals':>11} {'cold [s]':>9} {'cold dev [deg]':>15} {'warm evals':>11} "
+          f"{'warm [s]':>9} {'warm dev [deg]':>15}")
+    for name, shape in SHAPES.items():
+        points = datasets.cylinder_points(SIZE + max(ADDED), axis = AXIS, **shape)
+        prior, *_ = lsf.fit_cylinder(points[:SIZE])
+
+        for added in ADDED:
+            selection = points[:SIZE + added]
+            cold_evals, cold_time, (cold_axis, *_) = instrument.count_axis_evaluations(lsf.fit_cylinder, selection)
+            warm_evals, warm_time, (warm_axis, *_) = instrument.count_axis_evaluations(lsf.fit_cylinder, selection,
+                                                                                       prior = prior)
+
+            print(f"{name:>12} {added:>6} {cold_evals:>11} {cold_time:>9.3f} "
+                  f"{datasets.axis_deviation(cold_axis, AXIS):>15.2e} {warm_evals:>11} {warm_time:>9.3f} "
+                  f"{datasets.axis_deviation(warm_axis, AXIS):>15.2e}")
+
+
+if __name__ == "__main__":
+    main()
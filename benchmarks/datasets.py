@@ -0,0 +1,52 @@
+"""Synthetic point sets for benchmarking the fitting functions"""
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+
+def orthonormal_frame(axis: npt.ArrayLike) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """Return unit axis and two unit vectors perpendicular to it and to each other"""
+    axis = np.asarray(axis, dtype = float)
+    axis = axis / np.linalg.norm(axis)
+    helper = [1, 0, 0] if abs(axis[0]) < 0.9 else [0, 1, 0]
+    u = np.cross(axis, helper)
+    u /= np.linalg.norm(u)
+    v = np.cross(axis, u)
+    return axis, u, v
+
+
+def cylinder_points(count: int, radius: float = 0.02, length: float = 0.1, noise: float = 1e-6,
+                    axis: npt.ArrayLike = (0.3, 0.5, 0.8), origin: npt.ArrayLike = (0.1, 0.2, 0.3),
+                    arc: float = 2 * np.pi, seed: int = 0) -> npt.NDArray:
+    """Points on a cylinder surface (or its part spanning the given arc) with gaussian noise"""
+    rng = np.random.default_rng(seed)
+    axis, u, v = orthonormal_frame(axis)
+    angles = rng.uniform(0, arc, count)
+    heights = rng.uniform(0, length, count)
+
+    points = np.outer(heights, axis) + radius * (np.outer(np.cos(angles), u) + np.outer(np.sin(angles), v))
+    return points + origin + rng.normal(0, noise, (count, 3))
+
+
+def circle_points(count: int, radius: float = 0.02, noise: float = 1e-6, normal: npt.ArrayLike = (0.3, 0.5, 0.8),
+                  center: npt.ArrayLike = (0.1, 0.2, 0.3), seed: int = 0) -> npt.NDArray:
+    """Points on a circle with gaussian noise"""
+    return cylinder_points(count, radius, 0, noise, normal, center, seed = seed)
+
+
+def plane_points(count: int, size: float = 0.1, noise: float = 1e-6, normal: npt.ArrayLike = (0.3, 0.5, 0.8),
+                 origin: npt.ArrayLike = (0.1, 0.2, 0.3), seed: int = 0) -> npt.NDArray:
+    """Points on a square part of a plane with gaussian noise"""
+    rng = np.random.default_rng(seed)
+    _, u, v = orthonormal_frame(normal)
+    coordinates = rng.uniform(0, size, (count, 2))
+
+    points = np.outer(coordinates[:, 0], u) + np.outer(coordinates[:, 1], v)
+    return points + origin + rng.normal(0, noise, (count, 3))
+
+
+def axis_deviation(axis: npt.ArrayLike, reference: npt.ArrayLike) -> float:
+    """Angle between two axes in degrees regardless of their orientation"""
+    cos = abs(np.dot(axis, reference)) / np.linalg.norm(axis) / np.linalg.norm(reference)
+    return float(np.degrees(np.arccos(np.clip(cos, 0, 1))))
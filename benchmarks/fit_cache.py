@@ -0,0 +1,36 @@
+"""
+Compare fitting points for the first time with refitting them from the fit cache.
+Run from the repository root: python -m benchmarks.fit_cache
+"""
+import time
+
+import lsf
+from benchmarks import datasets
+from config import load_config
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+
+def main() -> None:
+    load_config()
+
+    print(f"{'points':>10} {'first fit [s]':>14} {'refit [s]':>10} {'speedup':>8}")
+    for size in SIZES:
+        points = datasets.cylinder_points(size)
+
+        start = time.perf_counter()
+        lsf.fit_cylinder(points)
+        first_time = time.perf_counter() - start
+
+        # Refit from a new array, as when the same vertices are selected again
+        start = time.perf_counter()
+        lsf.fit_cylinder(points.copy())
+        refit_time = time.perf_counter() - start
+
+        print(f"{size:>10} {first_time:>14.3f} {refit_time:>10.4f} {first_time / refit_time:>8.0f}")
+
+    print(lsf.fit_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare latency of requests to the fit service with fitting by launching a new script for every fit.
+Run from the repository root: python -m benchmarks.fit_service
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from benchmarks import datasets
+from config import load_config
+from service import FitClient
+from service.server import FitServer
+
+SIZE = 10_000
+COLD_RUNS = 3
+WARM_RUNS = 20
+CLIENTS = 4
+# Script fitting points saved in a file the way a macro launching a new interpreter would
+COLD_SCRIPT = """
+import sys
+import numpy as np
+from config import load_config
+load_config()
+import lsf
+lsf.fit_{fitting_object}(np.load(sys.argv[1]))
+"""
+
+
+def cold_latency(fitting_object: str, points) -> float:
+    """Median time of launching a new interpreter fitting the points"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "points.npy")
+        np.save(path, points)
+        times = []
+        for _ in range(COLD_RUNS):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", COLD_SCRIPT.format(fitting_object = fitting_object), path],
+                           check = True)
+            times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def warm_latency(port: int, fitting_object: str) -> tuple[float, float]:
+    """Median time of a request to the service for new points and for points fitted before"""
+    with FitClient("127.0.0.1", port) as client:
+        new_times, cached_times = [], []
+        for seed in range(WARM_RUNS):
+            points = generate(fitting_object, seed)
+            start = time.perf_counter()
+            client.fit(fitting_object, points)
+            new_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            client.fit(fitting_object, points)
+            cached_times.append(time.perf_counter() - start)
+    return float(np.median(new_times)), float(np.median(cached_times))
+
+
+def throughput(port: int, fitting_object: str) -> float:
+    """Requests per second answered for several clients sending requests at the same time"""
+    def send(client_index: int) -> None:
+        with FitClient("127.0.0.1", port) as client:
+            for seed in range(WARM_RUNS):
+                client.fit(fitting_object, generate(fitting_object, 1000 * (client_index + 1) + seed))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = CLIENTS) as executor:
+        list(executor.map(send, range(CLIENTS)))
+    return CLIENTS * WARM_RUNS / (time.perf_counter() - start)
+
+
+def generate(fitting_object: str, seed: int):
+    """Points of the given object"""
+    return getattr(datasets, f"{fitting_object}_points")(SIZE, seed = seed)
+
+
+def main() -> None:
+    load_config()
+
+    server = FitServer(("127.0.0.1", 0), CLIENTS)
+    port = server.server_address[1]
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+
+    print(f"{'object':>9} {'new script [s]':>15} {'request [ms]':>13} {'cached [ms]':>12} "
+          f"{f'{CLIENTS} clients [1/s]':>17}")
+    try:
+        for fitting_object in ("plane", "circle", "cylinder"):
+            cold = cold_latency(fitting_object, generate(fitting_object, 0))
+            warm, cached = warm_latency(port, fitting_object)
+            rate = throughput(port, fitting_object)
+            print(f"{fitting_object:>9} {cold:>15.3f} {warm * 1000:>13.1f} {cached * 1000:>12.1f} {rate:>17.1f}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
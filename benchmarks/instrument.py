@@ -0,0 +1,25 @@
+"""Helpers measuring the work done by the fitting functions"""
+import time
+
+from lsf import cylinder
+
+
+def count_axis_evaluations(function, *args, **kwargs) -> tuple[int, float, object]:
+    """Call function and return number of cylinder axes it evaluated, elapsed time and its result"""
+    evaluations = 0
+    fit_cylinder_to_axis = cylinder.fit_cylinder_to_axis
+
+    def counted(*axis_args, **axis_kwargs):
+        nonlocal evaluations
+        evaluations += 1
+        return fit_cylinder_to_axis(*axis_args, **axis_kwargs)
+
+    cylinder.fit_cylinder_to_axis = counted
+    try:
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    finally:
+        cylinder.fit_cylinder_to_axis = fit_cylinder_to_axis
+
+    return evaluations, elapsed, result
@@ -0,0 +1,56 @@
+"""
+Time the moments of a large point set calculated in chunks on 1 to 16 threads, compared with the moments calculated
+in one pass over the whole array.
+Run from the repository root: python -m benchmarks.moment_threads
+"""
+import os
+import statistics
+import time
+import numpy as np
+
+from benchmarks import datasets
+from config import load_config
+from lsf import moments as mom
+
+SIZE = 10_000_000
+THREADS = [1, 2, 4, 8, 16]
+RUNS = 3
+
+
+def single_pass(points: np.ndarray) -> tuple:
+    """Moments calculated over the whole array at once"""
+    mean = np.mean(points, axis = 0)
+    return mom.central_moments(len(points), *mom.power_sums(points - mean))
+
+
+def chunked(points: np.ndarray, threads: int) -> tuple:
+    """Moments calculated by the chunked kernel"""
+    mean = mom.chunked_power_sums(points, 1, threads = threads)[0] / len(points)
+    return mom.central_moments(len(points), *mom.chunked_power_sums(points, 4, mean, threads))
+
+
+def timed(function, *args) -> tuple[float, tuple]:
+    """Return median time of the runs and the result of the function"""
+    durations = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = function(*args)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), result
+
+
+def main() -> None:
+    load_config()
+    points = datasets.cylinder_points(SIZE)
+
+    reference_time, reference = timed(single_pass, points)
+    print(f"{SIZE} points, {os.cpu_count()} processors, single pass {reference_time:.3f} s")
+    print(f"{'threads':>8} {'time [s]':>9} {'speedup':>8} {'max rel diff':>13}")
+    for threads in THREADS:
+        duration, result = timed(chunked, points, threads)
+        difference = max(float(np.max(np.abs(a - b)) / np.max(np.abs(b))) for a, b in zip(result[1:], reference[1:]))
+        print(f"{threads:>8} {duration:>9.3f} {reference_time / duration:>8.2f} {difference:>13.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare fitting a hole pattern split into features by the segmentation with fitting each hole separately.
+Run from the repository root: python -m benchmarks.segmentation
+"""
+import time
+from collections import Counter
+import numpy as np
+
+import lsf
+from benchmarks import datasets
+from config import load_config
+
+ROWS = 20
+COLUMNS = 25
+PITCH = 0.02
+HOLE_POINTS = 400
+HOLE_RADIUS = 0.003
+HOLE_DEPTH = 0.01
+# Holes fitted one by one, the time is scaled to all holes
+LOOP_HOLES = 20
+
+
+def hole_pattern() -> list:
+    """Points of each hole of a plate drilled with a grid of holes"""
+    return [datasets.cylinder_points(HOLE_POINTS, radius = HOLE_RADIUS, length = HOLE_DEPTH, axis = (0, 0, 1),
+                                     origin = (row * PITCH, column * PITCH, 0), seed = row * COLUMNS + column)
+            for row in range(ROWS) for column in range(COLUMNS)]
+
+
+def main() -> None:
+    load_config()
+    lsf.fit_cache.clear()
+
+    holes = hole_pattern()
+    points = np.vstack(holes)
+
+    start = time.perf_counter()
+    segments = lsf.segment_points(points)
+    segmented = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for hole in holes[:LOOP_HOLES]:
+        lsf.fit_cylinder(hole)
+    loop = (time.perf_counter() - start) * len(holes) / LOOP_HOLES
+
+    radii = np.array([segment.fitting_data[1] for segment in segments if segment.fitting_object == "cylinder"])
+    print(f"{len(holes)} holes, {len(points)} points")
+    print(f"Segments: {dict(Counter(segment.fitting_object for segment in segments))}")
+    print(f"Largest radius error: {np.max(np.abs(radii - HOLE_RADIUS)):.2e} m")
+    print(f"Segmentation: {segmented:.2f} s, separate fits: {loop:.2f} s, speedup {loop / segmented:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Fit objects to selections saved from Solid Edge without running it, timing loading of the file and each fit.
+Without arguments a synthetic cylinder selection is saved to a temporary file and replayed.
+Run from the repository root: python -m benchmarks.selection_replay [selection files...] [--objects plane,cylinder]
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+import lsf
+from benchmarks import datasets
+from config import load_config
+
+SIZE = 2000
+OBJECTS = ("plane", "cylinder", "line", "circle")
+
+
+def synthetic_selection(directory: str) -> str:
+    """Save a synthetic cylinder selection and return its file"""
+    file = os.path.join(directory, "cylinder.lsfsel")
+    points = datasets.cylinder_points(SIZE)
+    lsf.save_selection(file, "synthetic.par", np.arange(len(points)), points)
+    return file
+
+
+def replay(file: str, fitting_objects: tuple[str, ...]) -> None:
+    """Load the selection and fit every object to it"""
+    start = time.perf_counter()
+    selection = lsf.load_selection(file)
+    duration = time.perf_counter() - start
+    print(f"{os.path.basename(file)}: {len(selection.points)} vertices of {selection.document or '(unsaved)'}, "
+          f"loaded in {duration * 1000:.2f} ms")
+
+    for fitting_object in fitting_objects:
+        if len(selection.points) < lsf.required_points[fitting_object]:
+            continue
+        fitting_function = getattr(lsf, f"fit_{fitting_object}")
+        start = time.perf_counter()
+        *_, report = fitting_function(selection.points, report = True)
+        duration = time.perf_counter() - start
+        print(f"{fitting_object:>10}: {duration * 1000:8.1f} ms, RMS {report.rms * 1000:.4f} mm")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Fit objects to saved selections")
+    parser.add_argument("files", nargs = "*", help = "selection files saved by the vertex selector")
+    parser.add_argument("--objects", default = ",".join(OBJECTS), help = "comma separated fitted objects")
+    arguments = parser.parse_args()
+
+    load_config()
+    fitting_objects = tuple(arguments.objects.split(","))
+    if arguments.files:
+        for file in arguments.files:
+            replay(file, fitting_objects)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        replay(synthetic_selection(directory), fitting_objects)
+
+
+if __name__ == "__main__":
+    main()
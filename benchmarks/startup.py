@@ -0,0 +1,130 @@
+"""
+Time the application start-up with the Windows COM modules replaced by stubs, comparing the serial start-up with the
+start-up overlapping the imports and type library loading with the configuration and window creation.
+Run from the repository root: python -m benchmarks.startup
+"""
+import json
+import statistics
+import subprocess
+import sys
+import time
+import types
+
+RUNS = 5
+# Typical duration (s) of loading the generated type library wrappers and of connecting to a running Solid Edge, half
+# of the loading is spent in Python holding the interpreter lock and half waiting for the disk
+TYPE_LIBRARY_DELAY = 0.4
+CONNECT_DELAY = 0.05
+
+
+def busy(seconds: float) -> None:
+    """Keep the interpreter busy for a while"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def ensure_module(*_):
+    """Stub of loading a type library wrapper"""
+    busy(TYPE_LIBRARY_DELAY / 4)
+    time.sleep(TYPE_LIBRARY_DELAY / 4)
+    return types.SimpleNamespace(constants = types.SimpleNamespace())
+
+
+def get_active_object(_name: str):
+    """Stub of connecting to a running application"""
+    time.sleep(CONNECT_DELAY)
+    return types.SimpleNamespace()
+
+
+def install_stubs() -> None:
+    """Replace the Windows COM modules by stubs taking the typical time of the real calls"""
+    pywintypes = types.ModuleType("pywintypes")
+    pywintypes.com_error = type("com_error", (Exception,), {"hresult": 0})
+    pythoncom = types.ModuleType("pythoncom")
+    pythoncom.CoInitialize = lambda: None
+
+    win32com = types.ModuleType("win32com")
+    client = types.ModuleType("win32com.client")
+    client.gencache = types.SimpleNamespace(EnsureModule = ensure_module)
+    client.GetActiveObject = get_active_object
+    win32com.client = client
+
+    sys.modules.update({"pywintypes": pywintypes, "pythoncom": pythoncom, "win32gui": types.ModuleType("win32gui"),
+                        "win32com": win32com, "win32com.client": client})
+
+
+def show_window():
+    """Create and draw the application window, None without a display"""
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.update()
+    return root
+
+
+def serial(start: float) -> dict[str, float]:
+    """Original start-up importing everything, then loading configuration, then connecting, then showing the window"""
+    timings = {}
+    import numpy
+    import lsf
+    import solidedge
+
+    from config import load_config
+    load_config()
+    timings["configuration"] = time.perf_counter() - start
+
+    solidedge.se.connect()
+    show_window()
+    timings["window"] = timings["ready"] = time.perf_counter() - start
+    return timings
+
+
+def overlapped(start: float) -> dict[str, float]:
+    """Start-up of the application, imports and type libraries load in the background"""
+    timings = {}
+    from gui import startup
+    warm_up = startup.start_warm_up()
+
+    from config import load_config
+    load_config()
+    timings["configuration"] = time.perf_counter() - start
+
+    show_window()
+    timings["window"] = time.perf_counter() - start
+
+    warm_up.result()
+    from solidedge import se
+    se.connect()
+    timings["ready"] = time.perf_counter() - start
+    return timings
+
+
+def run(mode: str) -> dict[str, float]:
+    """Time start-up in a new interpreter so that no module is imported yet"""
+    output = subprocess.run([sys.executable, "-m", "benchmarks.startup", mode], check = True, capture_output = True,
+                            text = True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    # Modules are imported only after the start-up is timed
+    if len(sys.argv) > 1:
+        start = time.perf_counter()
+        install_stubs()
+        timings = serial(start) if sys.argv[1] == "serial" else overlapped(start)
+        print(json.dumps(timings))
+        return
+
+    phases = ("configuration", "window", "ready")
+    print(f"{'start-up':>11} " + " ".join(f"{phase + ' [s]':>17}" for phase in phases))
+    for mode in ("serial", "overlapped"):
+        results = [run(mode) for _ in range(RUNS)]
+        medians = [statistics.median(result[phase] for result in results) for phase in phases]
+        print(f"{mode:>11} " + " ".join(f"{median:>17.3f}" for median in medians))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Time logging many info messages to the status bar, redrawing the label for every message compared with posting them
+to the throttled status channel. Needs a display.
+Run from the repository root: python -m benchmarks.status_logging
+"""
+import logging
+import time
+import tkinter as tk
+
+from config import load_config
+from gui.status import StatusChannel
+from gui.tklogging import StatusHandler
+
+MESSAGES = 2000
+
+
+def log_messages(display) -> float:
+    """Return time of logging the messages through the status bar handler calling display"""
+    logger = logging.getLogger("LSF.benchmark")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = StatusHandler(display)
+    logger.addHandler(handler)
+
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        logger.info(f"Evaluating level {i}")
+    duration = time.perf_counter() - start
+    logger.removeHandler(handler)
+    return duration
+
+
+def main() -> None:
+    load_config()
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("No display available")
+        return
+    label = tk.Label(root, width = 40)
+    label.pack()
+    root.update()
+
+    def synchronous(message: str) -> None:
+        label.configure(text = message)
+        label.update()
+
+    channel = StatusChannel(label, lambda message: label.configure(text = message))
+    for name, display in (("synchronous", synchronous), ("channel", channel.post)):
+        duration = log_messages(display)
+        print(f"{name:>12}: {duration / MESSAGES * 1e6:8.1f} us per message")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
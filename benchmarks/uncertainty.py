@@ -0,0 +1,56 @@
+"""
+Compare bootstrap uncertainty fitting all resamples at once with fitting each resample separately.
+Run from the repository root: python -m benchmarks.uncertainty
+"""
+import time
+import numpy as np
+
+import lsf
+from benchmarks import datasets
+from config import load_config
+
+SIZE = 10_000
+RESAMPLES = 1000
+# Resamples fitted one by one, the time is scaled to the full number of resamples
+LOOP_RESAMPLES = 20
+SHAPES = {
+    "plane": datasets.plane_points,
+    "circle": datasets.circle_points,
+    "cylinder": datasets.cylinder_points
+}
+
+
+def loop_bootstrap(fitting_object: str, points, resamples: int) -> float:
+    """Return time of fitting each resample with the regular fitting function"""
+    fitting_function = getattr(lsf, f"fit_{fitting_object}")
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(resamples):
+        fitting_function(points[rng.integers(0, len(points), len(points))])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    load_config()
+    lsf.fit_cache.clear()
+
+    print(f"{'object':>9} {'single fit [s]':>15} {'approximate [s]':>16} {'exact [s]':>10} {'loop [s]':>9} "
+          f"{'speedup':>8}")
+    for name, generator in SHAPES.items():
+        points = generator(SIZE, noise = 1e-4)
+        single = loop_bootstrap(name, points, 1)
+
+        start = time.perf_counter()
+        lsf.fit_uncertainty(name, points, resamples = RESAMPLES, exact = False)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lsf.fit_uncertainty(name, points, resamples = RESAMPLES, exact = True)
+        exact = time.perf_counter() - start
+
+        loop = loop_bootstrap(name, points, LOOP_RESAMPLES) * RESAMPLES / LOOP_RESAMPLES
+        print(f"{name:>9} {single:>15.4f} {batched:>16.3f} {exact:>10.3f} {loop:>9.2f} {loop / batched:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,78 @@
 import os
 import logging
+import threading
 
-from config.config import _Config
+from config.config import _Config, ConfigValueError, compile_options, read_options
+from config.schema import SETTINGS, CHECKS, text_schema
 
 logger = logging.getLogger("LSF")
 
 _config_file = "config/settings.ini"
 _language_folder = "config/lang"
+# Language every other language has to translate completely
+_reference_language = "en"
 
 
-def load_config() -> bool:
-    """Load configuration and language data"""
-    config.load_config(_config_file)
+def _language_file(language: str) -> str:
+    return f"{_language_folder}/{language}.ini"
+
+
+def _compile() -> tuple:
+    """Compile settings and the selected language, raise ConfigValueError describing every incorrect option"""
+    settings = compile_options(read_options(_config_file), SETTINGS, _config_file, CHECKS)
 
-    language_file = f"{_language_folder}/{config.language}.ini"
+    language_file = _language_file(settings.language)
     if not os.path.isfile(language_file):
-        logger.error(f"Incorrect configuration|Selected language (\"{config.language}\") doesn't exist")
+        raise ConfigValueError(f"Selected language (\"{settings.language}\") doesn't exist")
+    schema = text_schema(read_options(_language_file(_reference_language)))
+    return settings, compile_options(read_options(language_file), schema, language_file)
+
+
+def load_config() -> bool:
+    """Load configuration and language data"""
+    try:
+        settings, language = _compile()
+    except ConfigValueError as e:
+        logger.error(f"Incorrect configuration|{e}")
         return False
 
-    lang.load_config(language_file)
+    config.swap(settings)
+    lang.swap(language)
     return True
 
 
+def watch_config(interval: float) -> threading.Event:
+    """
+    Reload configuration and language data whenever their files change, checking every interval seconds.
+    Incorrect files are reported and the previous configuration is kept. Return event stopping the watching when set.
+    """
+    stop = threading.Event()
+
+    def modified() -> tuple:
+        files = (_config_file, _language_file(config.language))
+        return tuple(os.stat(file).st_mtime_ns if os.path.isfile(file) else None for file in files)
+
+    def watch() -> None:
+        last_modified = changed = modified()
+        while not stop.wait(interval):
+            # Files are reloaded once they stop changing so that a file being written isn't read half-way
+            current, changed = changed, modified()
+            if changed == last_modified or changed != current:
+                continue
+            try:
+                settings, language = _compile()
+            except ConfigValueError as e:
+                logger.warning(f"Configuration not reloaded: {e}")
+            else:
+                # Language first so that the settings never point to a language that isn't loaded
+                lang.swap(language)
+                config.swap(settings)
+                logger.info("Configuration reloaded")
+            last_modified = changed
+
+    threading.Thread(target = watch, name = "config-watch", daemon = True).start()
+    return stop
+
+
 config = _Config()
 lang = _Config()
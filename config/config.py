@@ -1,93 +1,148 @@
 from __future__ import annotations
 
-import re
 import configparser
+from typing import Callable
 
-
-def cast_value(value: str) -> str | int | float | list:
-    value = value.strip()
-    """Cast value to the correct type"""
-    # int
-    if re.match(r"^-?[0-9]+$", value):
-        return int(value)
-    # float
-    if re.match(r"^-?[0-9]+\.?[0-9]*$", value):
-        return float(value)
-    # list
-    if value.startswith("[") and value.endswith("]") and value.count("[") == 1 and value.count("]") == 1:
-        return [cast_value(item) for item in value[1:-1].split(",")]
-    # string
-    return value.replace("\\n", "\n")
+# Section whose options are accessed directly on the configuration
+_GLOBAL_SECTION = "global"
 
 
 class ConfigNotLoadedError(Exception):
     """Exception when trying to access configuration before loading it"""
 
 
-class _DirectAccessDict(dict):
-
-    def _get_value(self, item):
-        """Return item and convert any dicts into DirectAccessDict"""
-        # When item isn't defined in self, try checking the DEFAULT section if one exists
-        if item in self:
-            value = super().__getitem__(item)
-        elif "DEFAULT" in self:
-            value = self["DEFAULT"].__getitem__(item)
-        else:
-            raise KeyError(item)
-
-        # Cast any dicts to _DirectAccessDict
-        if isinstance(value, dict):
-            value = _DirectAccessDict(value)
-        elif isinstance(value, (tuple, list)):
-            value = [_DirectAccessDict(item) if isinstance(item, dict) else item for item in value]
-
-        return value
+class ConfigValueError(ValueError):
+    """Exception when a configuration file misses options or has options of a wrong type or value"""
 
-    __getitem__ = _get_value
-    __getattr__ = _get_value
 
+class _Options:
+    """
+    Immutable options accessible as attributes or items. Each section gets its own class with a slot for every option
+    so that reading an option is a plain attribute lookup.
+    """
+    __slots__ = ()
+    _name = ""
 
-class _Config:
-    """Configuration loaded on demand supporting accessing options by dot notation"""
+    def __getitem__(self, item):
+        try:
+            return getattr(self, item)
+        except AttributeError:
+            raise KeyError(item) from None
 
-    def __init__(self):
-        self.__dict__["_config"] = None
+    def __setattr__(self, key, value) -> None:
+        """Raise an error when the user attempts to set an attribute of config object"""
+        raise AttributeError(f"Cannot set/modify configuration attribute of class '{self.__class__.__name__}'")
 
-    def load_config(self, file: str) -> None:
-        """Load configurations from .ini file"""
-        # Add "unsectioned_values" at the beginning of the file to catch generic settings without a group
-        # NOTE: this is probably a very bad practice going against .ini file standard
-        cfg = configparser.ConfigParser()
-        cfg.read(file, encoding = "utf-8")
-
-        # Go through all loaded settings and try casting them to specific data types
-        cast_cfg = {}
-        for section, section_data in cfg.items():
-            if section == "DEFAULT":
+    def __repr__(self) -> str:
+        options = ", ".join(f"{key}={getattr(self, key)!r}" for key in self.__slots__)
+        return f"{self._name}({options})"
+
+
+def _freeze(name: str, values: dict[str, object]) -> _Options:
+    """Create immutable options holding the values"""
+    options_class = type(name, (_Options,), {"__slots__": tuple(values), "_name": name})
+    options = object.__new__(options_class)
+    for key, value in values.items():
+        object.__setattr__(options, key, value)
+    return options
+
+
+def read_options(file: str) -> dict[str, dict[str, str]]:
+    """Read options of an .ini file as text"""
+    cfg = configparser.ConfigParser(interpolation = None)
+    try:
+        if not cfg.read(file, encoding = "utf-8"):
+            raise ConfigValueError(f"File {file} doesn't exist")
+    except configparser.Error as e:
+        raise ConfigValueError(f"File {file} couldn't be read: {e}") from None
+    return {section: dict(cfg[section]) for section in cfg.sections()}
+
+
+def compile_options(options: dict[str, dict[str, str]], schema: dict[str, dict[str, Callable[[str], object]]],
+                    file: str = "", checks: dict[str, tuple[Callable[[dict], None], ...]] | None = None) -> _Options:
+    """
+    Convert options read from a file to their types given by the schema and freeze them.
+    Checks of a section are run on its converted options and raise ValueError when the options don't fit together.
+    Raise ConfigValueError listing every missing, unknown or invalid option.
+    """
+    errors = []
+    sections = {}
+    for section, parsers in schema.items():
+        if section not in options:
+            errors.append(f"Section [{section}] is missing")
+            continue
+
+        values = {}
+        for key, parse in parsers.items():
+            if key not in options[section]:
+                errors.append(f"Option '{key}' in [{section}] is missing")
                 continue
+            try:
+                values[key] = parse(options[section][key])
+            except ValueError as e:
+                errors.append(f"Option '{key}' in [{section}] {e}")
+        if len(values) == len(parsers):
+            for check in (checks or {}).get(section, ()):
+                try:
+                    check(values)
+                except ValueError as e:
+                    errors.append(f"Section [{section}] {e}")
+        errors.extend(f"Option '{key}' in [{section}] is unknown" for key in options[section] if key not in parsers)
+        sections[section] = values
+    errors.extend(f"Section [{section}] is unknown" for section in options if section not in schema)
+
+    if errors:
+        raise ConfigValueError(f"{file}:\n" + "\n".join(errors) if file else "\n".join(errors))
+
+    # Options of the global section are accessed directly, other sections by their name
+    values = {section: _freeze(section, section_values) for section, section_values in sections.items()
+              if section != _GLOBAL_SECTION}
+    values.update(sections.get(_GLOBAL_SECTION, {}))
+    return _freeze("config", values)
 
-            # Cast data to their respective data types. Store settings from "global" section in the main cfg dict
-            cast_section_data = {key: cast_value(item) for key, item in section_data.items()}
-            if section == "global":
-                cast_cfg.update(cast_section_data)
-            else:
-                cast_cfg[section] = cast_section_data
 
-        self.__dict__["_config"] = _DirectAccessDict(cast_cfg)
+class _Config:
+    """
+    Configuration supporting accessing options by dot notation. Options are compiled into an immutable snapshot when
+    loaded, reloading replaces the whole snapshot at once so readers never see a partially loaded configuration.
+    """
+    __slots__ = ("_snapshot",)
+    # Attributes of the configuration itself, any other attribute is an option
+    _OWN_ATTRIBUTES = frozenset(("_snapshot", "load_config", "swap", "__class__"))
+
+    def __init__(self) -> None:
+        object.__setattr__(self, "_snapshot", None)
+
+    def load_config(self, file: str, schema: dict[str, dict[str, Callable[[str], object]]]) -> None:
+        """Load configurations from .ini file"""
+        self.swap(compile_options(read_options(file), schema, file))
+
+    def swap(self, snapshot: _Options) -> None:
+        """Replace all options by a compiled snapshot"""
+        object.__setattr__(self, "_snapshot", snapshot)
+
+    def __getattribute__(self, item):
+        # Options are looked up directly in the snapshot, going through __getattr__ would raise an exception first
+        if item in _Config._OWN_ATTRIBUTES:
+            return object.__getattribute__(self, item)
+        snapshot = _get_snapshot(self)
+        if snapshot is None:
+            raise ConfigNotLoadedError("Configuration not loaded")
+        return getattr(snapshot, item)
 
-    def _get_value(self, item):
+    def __getitem__(self, item):
         """Get given settings option"""
-        if self._config is None:
+        snapshot = _get_snapshot(self)
+        if snapshot is None:
             raise ConfigNotLoadedError("Configuration not loaded")
-        return self._config[item]
-
-    __getitem__ = _get_value
-    __getattr__ = _get_value
+        return snapshot[item]
 
     def __repr__(self):
-        return "Direct access dict: " + repr(self._config)
+        return "Configuration: " + repr(_get_snapshot(self))
 
     def __setattr__(self, key, value) -> None:
         """Raise an error when the user attempts to set an attribute of config object"""
         raise AttributeError(f"Cannot set/modify configuration attribute of class '{self.__class__.__name__}'")
+
+
+_get_snapshot = _Config._snapshot.__get__
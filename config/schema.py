@@ -0,0 +1,175 @@
+"""Types and allowed values of the options in the settings file"""
+from __future__ import annotations
+
+from typing import Callable
+
+
+def text(value: str) -> str:
+    """Option holding text, \\n stands for a new line"""
+    return value.replace("\\n", "\n")
+
+
+def flag(value: str) -> bool:
+    """Option switching a feature on (1) or off (0)"""
+    if value.lower() in ("1", "true", "yes", "on"):
+        return True
+    if value.lower() in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"must be 1 or 0, got '{value}'")
+
+
+def integer(minimum: int | None = None, maximum: int | None = None) -> Callable[[str], int]:
+    """Option holding a whole number within the limits"""
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError(f"must be a whole number, got '{value}'") from None
+        return _check_range(number, minimum, maximum, False)
+
+    return parse
+
+
+def real(minimum: float | None = None, maximum: float | None = None, positive: bool = False) -> Callable[[str], float]:
+    """Option holding a number within the limits, positive numbers have to be larger than the minimum"""
+    def parse(value: str) -> float:
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"must be a number, got '{value}'") from None
+        return _check_range(number, minimum, maximum, positive)
+
+    return parse
+
+
+def real_list(minimum: float | None = None, maximum: float | None = None, positive: bool = False) -> \
+        Callable[[str], tuple[float, ...]]:
+    """Option holding a non-empty list of numbers within the limits written as [a, b, ...]"""
+    parse_item = real(minimum, maximum, positive)
+
+    def parse(value: str) -> tuple[float, ...]:
+        value = value.strip()
+        if not (value.startswith("[") and value.endswith("]")) or not value[1:-1].strip():
+            raise ValueError(f"must be a list of numbers like [1, 2], got '{value}'")
+        return tuple(parse_item(item) for item in value[1:-1].split(","))
+
+    return parse
+
+
+def _check_range(number, minimum, maximum, positive: bool):
+    """Return the number when it lies within the limits"""
+    if minimum is not None and (number <= minimum if positive else number < minimum):
+        raise ValueError(f"must be {'larger than' if positive else 'at least'} {minimum}, got {number}")
+    if maximum is not None and number > maximum:
+        raise ValueError(f"must be at most {maximum}, got {number}")
+    return number
+
+
+def ordered(smaller: str, larger: str) -> Callable[[dict[str, object]], None]:
+    """Check of a section requiring one of its options to be at most another one"""
+    def check(values: dict[str, object]) -> None:
+        if values[smaller] > values[larger]:
+            raise ValueError(f"option '{smaller}' ({values[smaller]}) must be at most '{larger}' ({values[larger]})")
+
+    return check
+
+
+# Options of the "global" section are accessed directly, e.g. config.language
+SETTINGS = {
+    "global": {
+        "language": text,
+        "cylinder_angle_steps": real_list(0, 90, positive = True)
+    },
+    "preview": {
+        "delay": integer(0),
+        "tolerance": real(0, positive = True)
+    },
+    "auto": {
+        "noise_floor": real(0, positive = True)
+    },
+    "quality": {
+        "percentiles": real_list(0, 100)
+    },
+    "moments": {
+        "threads": integer(0),
+        "chunk_size": integer(1)
+    },
+    "reduction": {
+        "merge_tolerance": real(0, positive = True),
+        "target_count": integer(0)
+    },
+    "multires": {
+        "min_points": integer(0),
+        "sample_size": integer(1),
+        "full_resolution_step": real(0),
+        "max_deviation": real(0)
+    },
+    "initial_axis": {
+        "enabled": flag,
+        "points_per_patch": integer(3),
+        "sample_size": integer(1),
+        "safety": real(0, positive = True)
+    },
+    "axis_hint": {
+        "tolerance": real(0, 90)
+    },
+    "angle_schedule": {
+        "tuned": flag,
+        "target_accuracy": real(0, positive = True),
+        "min_ratio": integer(2),
+        "max_ratio": integer(2)
+    },
+    "cache": {
+        "size": integer(0),
+        "disk_size": integer(0),
+        "directory": text
+    },
+    "warm_start": {
+        "cone": real(0, 90, positive = True),
+        "widening": real(1, positive = True)
+    },
+    "precision": {
+        "mixed": flag,
+        "float32_step": real(0, positive = True)
+    },
+    "uncertainty": {
+        "resamples": integer(1),
+        "confidence": real(0, 100, positive = True),
+        "seed": integer(0),
+        "exact_points": integer(0)
+    },
+    "sampling": {
+        "edge_points": integer(2),
+        "face_points": integer(4)
+    },
+    "segmentation": {
+        "spacing": real(0, positive = True),
+        "tolerance": real(0),
+        "min_points": integer(1)
+    },
+    "service": {
+        "host": text,
+        "port": integer(0, 65535),
+        "workers": integer(1),
+        "max_request_size": integer(1)
+    },
+    "status": {
+        "frame_rate": real(0, positive = True),
+        "queue_size": integer(1)
+    },
+    "reload": {
+        "watch": flag,
+        "interval": integer(1)
+    }
+}
+
+
+# Checks of options depending on each other, run once all options of the section are valid
+CHECKS = {
+    "angle_schedule": (ordered("min_ratio", "max_ratio"),)
+}
+
+
+def text_schema(options: dict[str, dict[str, str]]) -> dict[str, dict[str, Callable[[str], str]]]:
+    """Schema of a file holding only text with the same sections and options as the given ones, e.g. a language"""
+    return {section: {key: text for key in section_options} for section, section_options in options.items()}
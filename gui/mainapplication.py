@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import logging
 import tkinter as tk
-from tkinter import ttk
+from tkinter import filedialog, ttk
 
-from config import lang
+from config import config, lang
 import lsf
 import solidedge as se
+from gui.preview import FitPreview
+from gui.status import StatusChannel
 
 logger = logging.getLogger("LSF")
 
+SELECTION_EXTENSION = ".lsfsel"
+
 
 class MainApplication(ttk.Frame):
     """Main graphical window of the application"""
@@ -19,13 +23,22 @@ class MainApplication(ttk.Frame):
         mater.bind("<<OnClose>>", self.on_close)
 
         self.status_visible = False
+        self.axis_hint = None
         self.vertex_selector = se.VertexSelector()
+        self.fit_preview = FitPreview(self.vertex_selector)
+        self.object_names = {
+            "plane": lang.surfaces.plane,
+            "cylinder": lang.surfaces.cylinder,
+            "line": lang.curves.line,
+            "circle": lang.curves.circle
+        }
 
         # Main frame
         self.f_controls = ttk.Frame(self)
 
         # Info label
         self.l_info = tk.Label(self, fg = "gray30")
+        self.status = StatusChannel(self, self.set_info_display)
 
         # Vertex selection gui
         self.lf_selector = ttk.Labelframe(self.f_controls, text = lang.selector.frame)
@@ -33,7 +46,12 @@ class MainApplication(ttk.Frame):
         self.b_continue_selection = ttk.Button(self.lf_selector, text = lang.selector.continue_,
                                                command = self.continue_selector)
         self.b_stop_selection = ttk.Button(self.lf_selector, text = lang.selector.stop, command = self.stop_selector)
+        self.b_save_selection = ttk.Button(self.lf_selector, text = lang.selector.save, command = self.save_selection)
+        self.b_load_selection = ttk.Button(self.lf_selector, text = lang.selector.load, command = self.load_selection)
         self.l_counter = ttk.Label(self)
+        self.sample_entities = tk.BooleanVar(self, value = False)
+        self.cb_sampling = ttk.Checkbutton(self.lf_selector, text = lang.selector.sampling,
+                                           variable = self.sample_entities, command = self.select_sampling)
 
         # Surface fitting
         self.lf_surfaces = ttk.Labelframe(self.f_controls, text = lang.surfaces.frame)
@@ -53,6 +71,20 @@ class MainApplication(ttk.Frame):
         self.lf_combined = ttk.Labelframe(self.f_controls, text = lang.combined.frame)
         self.b_fit_plane_circle = ttk.Button(self.lf_combined, text = f"{lang.surfaces.plane} + {lang.curves.circle}",
                                              command = lambda: self.fit_object_to_points("plane", "circle"))
+        self.b_fit_auto = ttk.Button(self.lf_combined, text = lang.combined.auto, command = self.fit_best_object)
+        self.b_fit_segments = ttk.Button(self.lf_combined, text = lang.combined.segment, command = self.fit_segments)
+        self.use_axis_hint = tk.BooleanVar(self, value = False)
+        self.cb_axis_hint = ttk.Checkbutton(self.lf_combined, text = lang.combined.axis_hint,
+                                            variable = self.use_axis_hint, state = "disabled")
+
+        # Live preview of the fit while selecting
+        self.preview_objects = {lang.preview.off: None}
+        self.preview_objects.update({name: fitting_object for fitting_object, name in self.object_names.items()})
+        self.lf_preview = ttk.Labelframe(self.f_controls, text = lang.preview.frame)
+        self.cb_preview = ttk.Combobox(self.lf_preview, values = list(self.preview_objects), state = "readonly",
+                                       width = 10)
+        self.cb_preview.current(0)
+        self.cb_preview.bind("<<ComboboxSelected>>", self.select_preview)
 
         self.layout_widgets()
         self.update_counter()
@@ -76,6 +108,9 @@ class MainApplication(ttk.Frame):
             button.pack(padx = 6, pady = 2, ipadx = 6, fill = "x")
 
         # Other
+        self.cb_sampling.pack(padx = 6, pady = 2, fill = "x")
+        self.cb_axis_hint.pack(padx = 6, pady = 2, fill = "x")
+        self.cb_preview.pack(padx = 6, pady = 2, fill = "x")
         self.f_controls.pack(side = "top")
         self.l_info.pack(padx = 12, pady = 4, side = "right")
         self.l_counter.pack(padx = 12, pady = 4, side = "left")
@@ -83,7 +118,6 @@ class MainApplication(ttk.Frame):
     def set_info_display(self, info_message: str = "") -> None:
         """Display info message in GUI"""
         self.l_info.configure(text = info_message)
-        self.l_info.update()
 
     def update_counter(self) -> None:
         """Update selected vertices counter"""
@@ -98,8 +132,30 @@ class MainApplication(ttk.Frame):
 
         self.vertex_selector.process_events()
         self.update_counter()
+        self.update_preview()
         self.after(100, self.process_events)
 
+    def select_preview(self, *_) -> None:
+        """Change the previewed object"""
+        self.fit_preview.set_fitting_object(self.preview_objects[self.cb_preview.get()])
+        self.vertex_selector.highlight_outliers([])
+        self.status.post()
+
+    def update_preview(self) -> None:
+        """Display results of the preview fit once it is finished"""
+        result = self.fit_preview.poll()
+        if result is None:
+            return
+
+        rms, max_deviation, outliers = result
+        self.status.post(lang.info.preview.format(rms = rms * 1000, max = max_deviation * 1000,
+                                                  outliers = len(outliers)))
+        self.vertex_selector.highlight_outliers(outliers)
+
+    def select_sampling(self) -> None:
+        """Switch between selecting vertices only and selecting also edges and faces sampled by many points"""
+        self.vertex_selector.set_sampling(self.sample_entities.get())
+
     def run_selector(self) -> None:
         """Start vertex selection"""
         self.vertex_selector.new_selection()
@@ -114,6 +170,45 @@ class MainApplication(ttk.Frame):
         """Stop the vertex selection"""
         self.vertex_selector.stop()
 
+    def save_selection(self) -> None:
+        """Save the selected vertices to a file chosen by the user"""
+        if self.vertex_selector.count == 0:
+            logger.error(lang.errors.selection_empty)
+            return
+
+        file = filedialog.asksaveasfilename(defaultextension = SELECTION_EXTENSION, filetypes = self.selection_types)
+        if not file:
+            return
+        try:
+            self.vertex_selector.save(file)
+        except OSError as e:
+            logger.error(f"{lang.errors.selection_file}{e}")
+            return
+        logger.info(lang.info.selection_saved.format(count = self.vertex_selector.count))
+
+    def load_selection(self) -> None:
+        """Restore vertices saved in a file chosen by the user as a new selection"""
+        file = filedialog.askopenfilename(defaultextension = SELECTION_EXTENSION, filetypes = self.selection_types)
+        if not file:
+            return
+        try:
+            selection = lsf.load_selection(file)
+        except (OSError, lsf.SelectionFileError) as e:
+            logger.error(f"{lang.errors.selection_file}{e}")
+            return
+
+        if not self.vertex_selector.restore(selection):
+            return
+        self.update_counter()
+        self.process_events()
+        logger.info(lang.info.selection_loaded.format(count = self.vertex_selector.count,
+                                                      highlighted = len(self.vertex_selector.vertices)))
+
+    @property
+    def selection_types(self) -> list[tuple[str, str]]:
+        """File types offered when saving and loading selections"""
+        return [(lang.selector.file_type, f"*{SELECTION_EXTENSION}")]
+
     def clear(self) -> None:
         """Clear selector"""
         self.vertex_selector.clear()
@@ -121,30 +216,119 @@ class MainApplication(ttk.Frame):
         self.update_counter()
 
     def on_close(self, *_) -> None:
-        """When the application is closing terminate the mouse event"""
+        """When the application is closing terminate the mouse event and the preview"""
         self.stop_selector()
+        self.fit_preview.shutdown()
 
-    def fit_object_to_points(self, *fitting_objects: str) -> None:
-        """Fit a specified object to points"""
-        # Check enough points are selected
+    @staticmethod
+    def has_enough_points(count: int, fitting_objects: tuple[str, ...]) -> bool:
+        """Check enough points are available for fitting all the objects, display error if not"""
         for fitting_object in fitting_objects:
-            if self.vertex_selector.count < lsf.required_points[fitting_object]:
+            if count < lsf.required_points[fitting_object]:
                 logger.error(lang.errors[f"{fitting_object}_points"])
                 logger.info(lang.info.failed)
-                return
+                return False
+        return True
 
-        points = self.vertex_selector.get_coordinates()
-        self.clear()
+    def fit_object_to_points(self, *fitting_objects: str) -> None:
+        """Fit a specified object to points"""
+        # Check enough points are selected, and that enough remain after merging coincident points
+        if not self.has_enough_points(self.vertex_selector.count, fitting_objects):
+            return
+
+        # Cylinder fitted while previewing the selection seeds the final fit
+        prior = self.vertex_selector.cylinder_axis
+        point_set = self.take_point_set()
+        if point_set is None or not self.has_enough_points(len(point_set), fitting_objects):
+            return
 
         # Fit objects
         for fitting_object in fitting_objects:
-            fitting_function = getattr(lsf, f"fit_{fitting_object}")
-            drawing_function = getattr(se, f"construct_{fitting_object}")
+            fitting_data = self.fit_object(fitting_object, point_set, prior)
+            self.draw_object(fitting_object, fitting_data)
 
-            fitting_data = fitting_function(points)
-            if isinstance(fitting_data, tuple):
-                drawing_function(*fitting_data)
-            else:
-                drawing_function(fitting_data)
+        logger.info(lang.info.done)
+
+    def fit_object(self, fitting_object: str, point_set: lsf.PointSet, prior = None):
+        """
+        Fit object to the points, cylinder axis follows normal of the last fitted plane when requested, otherwise its
+        search starts from the prior axis when given
+        """
+        if fitting_object == "cylinder":
+            if self.axis_hint is not None and self.use_axis_hint.get():
+                return lsf.fit_cylinder(point_set, axis = self.axis_hint, axis_tolerance = config.axis_hint.tolerance)
+            return lsf.fit_cylinder(point_set, prior = prior)
+
+        fitting_function = getattr(lsf, f"fit_{fitting_object}")
+        fitting_data = fitting_function(point_set)
+
+        if fitting_object == "plane":
+            self.axis_hint = lsf.rectangle_normal(fitting_data)
+            self.cb_axis_hint.configure(state = "normal")
+        return fitting_data
+
+    def fit_best_object(self) -> None:
+        """Fit all objects to points and construct the one describing them best"""
+        if self.vertex_selector.count < min(lsf.required_points.values()):
+            logger.error(lang.errors.auto_points)
+            logger.info(lang.info.failed)
+            return
+
+        point_set = self.take_point_set()
+        if point_set is None or not self.has_enough_points(len(point_set), ("line",)):
+            return
+
+        best, _ = lsf.fit_auto(point_set)
+        self.draw_object(best.fitting_object, best.fitting_data)
+
+        logger.info(f"{lang.info.auto_best} {self.object_names[best.fitting_object]}")
 
+    def fit_segments(self) -> None:
+        """Split points into connected features, fit each of them and construct all of them at once"""
+        if self.vertex_selector.count < min(lsf.required_points.values()):
+            logger.error(lang.errors.auto_points)
+            logger.info(lang.info.failed)
+            return
+
+        point_set = self.take_point_set()
+        if point_set is None:
+            return
+
+        segments = lsf.segment_points(point_set)
+        if not segments:
+            logger.info(lang.info.failed)
+            return
+
+        counts = {fitting_object: 0 for fitting_object in self.object_names}
+        for segment in segments:
+            counts[segment.fitting_object] += 1
+        logger.info(lang.info.segments.format(count = len(segments), **counts))
+
+        se.construct_objects([(segment.fitting_object, segment.fitting_data) for segment in segments])
         logger.info(lang.info.done)
+
+    def take_point_set(self) -> None | lsf.PointSet:
+        """Return selected points and clear the selection"""
+        points = self.vertex_selector.get_coordinates()
+        if points is None:
+            return None
+
+        # All objects are fitted to the same point set so that its properties are calculated only once
+        point_set = lsf.PointSet(points, self.vertex_selector.get_moments())
+        self.clear()
+
+        # Merge coincident vertices of adjoining edges and bodies and optionally decimate dense regions
+        point_set = point_set.reduced(config.reduction.merge_tolerance, config.reduction.target_count)
+        if point_set.reduction.count < point_set.reduction.original_count:
+            logger.info(lang.info.reduction.format(original = point_set.reduction.original_count,
+                                                   count = point_set.reduction.count))
+        return point_set
+
+    @staticmethod
+    def draw_object(fitting_object: str, fitting_data) -> None:
+        """Construct fitted object in Solid Edge"""
+        drawing_function = getattr(se, f"construct_{fitting_object}")
+        if isinstance(fitting_data, tuple):
+            drawing_function(*fitting_data)
+        else:
+            drawing_function(fitting_data)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+import time
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import lsf
+from config import config
+
+logger = logging.getLogger("LSF")
+
+
+def fit_and_measure(fitting_object: str, point_set: lsf.PointSet, **kwargs) -> tuple:
+    """Fit object to the points and return the fitted object with quality of the fit as its last item"""
+    fitting_function = getattr(lsf, f"fit_{fitting_object}")
+    return fitting_function(point_set, report = True, **kwargs)
+
+
+class FitPreview:
+    """
+    Class for fitting an object to the selected vertices in a background thread whenever the selection changes.
+    Fitting starts only after the selection hasn't changed for a while and results of outdated selections are dropped.
+    """
+
+    def __init__(self, vertex_selector) -> None:
+        self.vertex_selector = vertex_selector
+        self.fitting_object: None | str = None
+        self.executor = ThreadPoolExecutor(max_workers = 1)
+
+        self.future: None | Future = None
+        self.future_version = -1
+        self.future_tags: list = []
+        self.future_object: None | str = None
+
+        self.seen_version = -1
+        self.change_time = 0.0
+        self.fitted_version = -1
+
+    def set_fitting_object(self, fitting_object: None | str) -> None:
+        """Select the previewed object, None turns the preview off"""
+        self.fitting_object = fitting_object
+        self.fitted_version = -1
+
+    def poll(self) -> None | tuple[float, float, list]:
+        """
+        Start fitting when the selection settled and collect finished fit.
+        Return RMS, maximum deviation and tags of outlier vertices when a fit of the current selection finishes.
+        This should be called in a loop and never blocks.
+        """
+        if self.fitting_object is None:
+            return None
+
+        version = self.vertex_selector.version
+        if version != self.seen_version:
+            self.seen_version = version
+            self.change_time = time.monotonic()
+
+        result = self.collect(version)
+        self.submit(version)
+        return result
+
+    def collect(self, version: int) -> None | tuple[float, float, list]:
+        """Return the result of a finished fit unless the selection changed in the meantime"""
+        if self.future is None or not self.future.done():
+            return None
+
+        future, self.future = self.future, None
+        if self.future_version != version:
+            return None
+
+        self.fitted_version = version
+        if future.exception() is not None:
+            logger.debug(f"Preview fit of {self.future_object} failed", exc_info = future.exception())
+            return None
+
+        *fitting_data, report = future.result()
+        if self.future_object == "cylinder":
+            self.vertex_selector.cylinder_axis = fitting_data[0]
+
+        is_outlier = np.abs(report.distances) > config.preview.tolerance
+        outliers = [tag for tag, outlier in zip(self.future_tags, is_outlier) if outlier]
+        return report.rms, report.max_deviation, outliers
+
+    def submit(self, version: int) -> None:
+        """Start fitting the current selection in the background if it settled and wasn't fitted yet"""
+        if self.future is not None or version == self.fitted_version:
+            return
+        if time.monotonic() - self.change_time < config.preview.delay / 1000:
+            return
+        if self.vertex_selector.count < lsf.required_points[self.fitting_object]:
+            return
+
+        # Cylinder refits start from the axis fitted to the previous selection
+        kwargs = {}
+        if self.fitting_object == "cylinder":
+            kwargs["prior"] = self.vertex_selector.cylinder_axis
+
+        tags, points, moments = self.vertex_selector.snapshot()
+        self.future = self.executor.submit(fit_and_measure, self.fitting_object, lsf.PointSet(points, moments),
+                                           **kwargs)
+        self.future_version = version
+        self.future_tags = tags
+        self.future_object = self.fitting_object
+
+    def shutdown(self) -> None:
+        """Stop the background thread without waiting for the running fit"""
+        self.executor.shutdown(wait = False, cancel_futures = True)
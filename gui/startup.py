@@ -0,0 +1,80 @@
+"""
+Application start-up. Heavy modules are imported and the Solid Edge type libraries are loaded on a background thread
+while the configuration is parsed and the window is created, the window gets its controls once both are done.
+"""
+from __future__ import annotations
+
+import importlib
+import time
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+import logging
+
+from config import lang
+
+logger = logging.getLogger("LSF")
+
+# Modules imported in the background, each pulls in the slow imports of the previous one
+_HEAVY_MODULES = ("numpy", "lsf", "solidedge")
+# Delay in milliseconds between checks whether the background start-up finished
+_POLL_DELAY = 20
+
+
+def warm_up() -> dict[str, float]:
+    """Import heavy modules and load the Solid Edge type libraries. Return duration of each phase in seconds"""
+    timings = {}
+    for name in _HEAVY_MODULES:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[f"import {name}"] = time.perf_counter() - start
+
+    from solidedge import seconnect
+    start = time.perf_counter()
+    seconnect.load_type_libraries()
+    timings["type libraries"] = time.perf_counter() - start
+    return timings
+
+
+def start_warm_up() -> Future:
+    """Run warm_up on a background thread"""
+    executor = ThreadPoolExecutor(max_workers = 1)
+    future = executor.submit(warm_up)
+    executor.shutdown(wait = False)
+    return future
+
+
+def is_com_error(exception: BaseException) -> bool:
+    """Whether the exception comes from COM, e.g. when Solid Edge or its type libraries aren't available"""
+    try:
+        from pywintypes import com_error
+    except ImportError:
+        return False
+    return isinstance(exception, com_error)
+
+
+def finish_when_ready(root: tk.Tk, warm_up_future: Future, on_connected: Callable[[], None]) -> None:
+    """
+    Connect to Solid Edge once the background start-up finishes and call on_connected, or close the application when
+    either fails. Polls from the Tk event loop so that the window stays responsive meanwhile.
+    """
+    if not warm_up_future.done():
+        root.after(_POLL_DELAY, finish_when_ready, root, warm_up_future, on_connected)
+        return
+
+    exception = warm_up_future.exception()
+    if exception is not None:
+        if is_com_error(exception):
+            logger.error(lang.errors.se_not_running)
+        else:
+            logger.exception(lang.errors.startup_failed.format(error = exception), exc_info = exception)
+        root.destroy()
+        return
+    logger.debug(f"Background start-up: {warm_up_future.result()}")
+
+    # Connecting has to happen in the thread handling the Solid Edge events
+    from solidedge import se
+    if not se.connect():
+        root.destroy()
+        return
+    on_connected()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import collections
+import threading
+import time
+import tkinter as tk
+from typing import Callable
+
+from config import config
+
+
+class StatusChannel:
+    """
+    Status messages posted from any thread and displayed by the GUI at most status.frame_rate times a second.
+    Posting never blocks, only the latest message is displayed and the older ones waiting for display are dropped.
+    """
+
+    def __init__(self, widget: tk.Misc, display: Callable[[str], None]) -> None:
+        self.widget = widget
+        self.display = display
+        self.interval = 1 / config.status.frame_rate
+        # Appending drops the oldest message once the queue is full, deque appends and pops are thread-safe
+        self.messages = collections.deque(maxlen = config.status.queue_size)
+        self.last_drawn = 0.0
+        self.poll()
+
+    def post(self, message: str = "") -> None:
+        """
+        Queue message for display. Messages from the main thread are drawn right away when the last drawing is old
+        enough so that they show while a long task blocks the event loop.
+        """
+        self.messages.append(message)
+        if threading.current_thread() is threading.main_thread() and \
+                time.perf_counter() - self.last_drawn >= self.interval:
+            self.flush(redraw = True)
+
+    def flush(self, redraw: bool = False) -> None:
+        """Display the latest queued message, optionally redraw the window without processing other events"""
+        message = None
+        try:
+            while True:
+                message = self.messages.popleft()
+        except IndexError:
+            pass
+        if message is None:
+            return
+
+        self.display(message)
+        self.last_drawn = time.perf_counter()
+        if redraw:
+            self.widget.update_idletasks()
+
+    def poll(self) -> None:
+        """Display messages posted from other threads, runs in the Tk event loop"""
+        self.flush()
+        self.widget.after(round(self.interval * 1000), self.poll)
@@ -1,16 +1,26 @@
 import logging
+import threading
 from tkinter import messagebox
 from typing import Callable
 
 
+def is_main_thread(_record: logging.LogRecord) -> bool:
+    """Filter out records logged outside of the main thread, tkinter may only be used from the main thread"""
+    return threading.current_thread() is threading.main_thread()
+
+
 class PopupHandler(logging.Handler):
     """Class for displaying logging errors in a tkinter popup window"""
 
+    def __init__(self):
+        super().__init__()
+        self.addFilter(is_main_thread)
+
     def emit(self, record: logging.LogRecord) -> None:
         """Throw a popup warning with the error"""
         raw_message = self.format(record)
         if "|" in raw_message:
-            title, message = raw_message.split("|")
+            title, message = raw_message.split("|", 1)
         else:
             title = "Error"
             message = raw_message
@@ -18,7 +28,7 @@ class PopupHandler(logging.Handler):
 
 
 class StatusHandler(logging.Handler):
-    """Class for displaying info messages in a status bar"""
+    """Class for displaying info messages in a status bar, display_info_func has to accept messages from any thread"""
 
     def __init__(self, display_info_func: Callable):
         super().__init__()
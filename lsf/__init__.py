@@ -1,5 +1,14 @@
 from lsf.requirements import required_points
-from lsf.plane import fit_plane
+from lsf.moments import Moments
+from lsf.pointset import PointSet
+from lsf.reduction import Reduction
+from lsf.plane import fit_plane, rectangle_normal
 from lsf.cylinder import fit_cylinder
 from lsf.line import fit_line
 from lsf.circle import fit_circle
+from lsf.residuals import FitReport
+from lsf.auto import fit_auto
+from lsf.cache import CacheStats, fit_cache
+from lsf.uncertainty import Uncertainty, fit_uncertainty
+from lsf.segmentation import Segment, segment_points
+from lsf.selection import Selection, SelectionFileError, load_selection, save_selection
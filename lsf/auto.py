@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import numpy as np
+import numpy.typing as npt
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+import logging
+
+from lsf.plane import fit_plane
+from lsf.cylinder import FitCancelledError, fit_cylinder
+from lsf.line import fit_line
+from lsf.circle import fit_circle
+from lsf.pointset import PointSet
+from lsf.requirements import required_points
+from lsf.residuals import FitReport
+from config import config, lang
+
+logger = logging.getLogger("LSF")
+
+# Number of parameters of each object and number of coordinates of a point constrained by lying on the object
+_MODELS = {
+    "plane": (3, 1),
+    "cylinder": (5, 1),
+    "line": (4, 2),
+    "circle": (6, 2)
+}
+
+
+class Candidate(NamedTuple):
+    """Object fitted in the automatic mode together with its score (lower is better)"""
+    fitting_object: str
+    score: float
+    report: FitReport
+    fitting_data: tuple | npt.NDArray
+
+
+def description_length(fitting_object: str, rms: float, num_points: int, extent: float, noise_floor: float,
+                       include_residuals: bool = True) -> float:
+    """
+    Score a fitted object by the length of the description of the points using the object.
+    Each point is described by its free coordinates on the object at the noise floor resolution and by its residual.
+    Objects constraining more coordinates of the points (curves) are therefore preferred over surfaces when both fit,
+    and the number of parameters of the object is penalized.
+    """
+    parameters, constrained = _MODELS[fitting_object]
+    free = 3 - constrained
+
+    parameter_cost = parameters / 2 * np.log(num_points)
+    coordinate_cost = num_points * free * np.log(max(extent / noise_floor, 1.0))
+    residual_cost = num_points * constrained / 2 * np.log1p(rms ** 2 / (constrained * noise_floor ** 2))
+
+    if not include_residuals:
+        return float(parameter_cost + coordinate_cost)
+    return float(parameter_cost + coordinate_cost + residual_cost)
+
+
+def _fit(fitting_object: str, point_set: PointSet, cancel: threading.Event) -> tuple:
+    """Run fitting function of the given object and return its results with the quality report"""
+    if fitting_object == "plane":
+        return fit_plane(point_set, report = True)
+    if fitting_object == "cylinder":
+        return fit_cylinder(point_set, cancel = cancel, report = True)
+    if fitting_object == "line":
+        return fit_line(point_set, report = True)
+    return fit_circle(point_set, report = True)
+
+
+def fit_auto(points: npt.ArrayLike | PointSet) -> tuple[Candidate, list[Candidate]]:
+    """
+    Fit all objects applicable to the number of points concurrently and pick the one describing the points best.
+    Return the winner and all successfully fitted candidates ordered from the best.
+    Cylinder search is cancelled as soon as another object is known to score better than any cylinder could.
+    """
+    logger.info(lang.info.auto_fitting)
+
+    point_set = PointSet.of(points)
+    num_points = len(point_set)
+    noise_floor = config.auto.noise_floor
+    min_coords, max_coords = point_set.bounds
+    extent = float(np.linalg.norm(max_coords - min_coords))
+
+    # Calculate shared properties before the fitting threads start using them
+    _ = point_set.principal_axes, point_set.cylinder_moments, point_set.fingerprint
+
+    fitting_objects = [name for name in _MODELS if num_points >= required_points[name]]
+    if not fitting_objects:
+        raise ValueError("Not enough points to fit any object")
+
+    candidates = []
+    cancel = threading.Event()
+    with ThreadPoolExecutor(max_workers = len(fitting_objects)) as executor:
+        futures = {name: executor.submit(_fit, name, point_set, cancel) for name in fitting_objects}
+
+        # Cheap objects finish first, cylinder is the only object worth pruning
+        for name in sorted(futures, key = lambda item: item == "cylinder"):
+            try:
+                *fitting_data, report = futures[name].result()
+            except FitCancelledError:
+                continue
+            except (np.linalg.LinAlgError, ValueError, FloatingPointError) as e:
+                logger.debug(f"Automatic fitting of {name} failed: {e}")
+                continue
+            if not np.isfinite(report.rms):
+                continue
+
+            # Plane is returned as a single array, other objects as tuples
+            fitting_data = fitting_data[0] if name == "plane" else tuple(fitting_data)
+            score = description_length(name, report.rms, num_points, extent, noise_floor)
+            candidates.append(Candidate(name, score, report, fitting_data))
+
+            if "cylinder" in futures and not cancel.is_set():
+                # Plane already fits within the noise, or no cylinder could score better than the best candidate
+                best_score = min(candidate.score for candidate in candidates)
+                cylinder_bound = description_length("cylinder", 0, num_points, extent, noise_floor,
+                                                    include_residuals = False)
+                if (name == "plane" and report.rms <= noise_floor) or best_score <= cylinder_bound:
+                    cancel.set()
+
+    if not candidates:
+        raise ValueError("No object could be fitted to the points")
+
+    ranked = sorted(candidates, key = lambda candidate: candidate.score)
+    return ranked[0], ranked
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from lsf.pointset import PointSet
+from lsf.reduction import voxel_grid
+from config import config
+
+# Patches with fewer points don't give a reliable normal
+_MIN_PATCH_POINTS = 5
+# Patches with the ratio of the two smallest eigenvalues of their scatter above this aren't flat enough
+_MAX_PATCH_FLATNESS = 0.1
+# Ratios of the principal variances recognizing a long tube and a short ring from the shape of the point cloud
+_TUBE_ELONGATION = 4.0
+_TUBE_ROUNDNESS = 0.5
+_RING_FLATNESS = 0.25
+_RING_ROUNDNESS = 0.5
+
+
+def patch_normals(points: npt.NDArray, points_per_patch: int) -> npt.NDArray:
+    """Estimate surface normals of small flat patches formed by grouping the points by voxels"""
+    inverse, count, _ = voxel_grid(points, max(len(points) // points_per_patch, 1))
+    sizes = np.bincount(inverse, minlength = count).astype(float)
+
+    # Scatter matrix of each voxel from sums of coordinates and their products
+    x = points - np.mean(points, axis = 0)
+    sums = np.stack([np.bincount(inverse, weights = x[:, i], minlength = count) for i in range(3)], axis = 1)
+    products = np.einsum("ni,nj->nij", x, x).reshape(-1, 9)
+    product_sums = np.stack([np.bincount(inverse, weights = products[:, i], minlength = count) for i in range(9)],
+                            axis = 1).reshape(-1, 3, 3)
+
+    valid = sizes >= _MIN_PATCH_POINTS
+    means = sums[valid] / sizes[valid, None]
+    scatters = product_sums[valid] / sizes[valid, None, None] - np.einsum("ni,nj->nij", means, means)
+
+    eigenvalues, eigenvectors = np.linalg.eigh(scatters)
+    flat = eigenvalues[:, 0] <= _MAX_PATCH_FLATNESS * np.maximum(eigenvalues[:, 1], np.finfo(float).tiny)
+    return eigenvectors[flat, :, 0]
+
+
+def estimate_axis(point_set: PointSet, first_step: float) -> None | tuple[npt.NDArray, float]:
+    """
+    Estimate the cylinder axis without searching. Return the axis and half angle (radians) of a cone that should contain
+    the best axis, or None when the points don't reveal the axis and all directions have to be searched.
+    Normals of a cylinder surface are perpendicular to its axis, so the axis is the direction the patch normals vary
+    least in. When the normals don't determine the axis, the shape of a long tube or a short ring is used instead.
+    """
+    sample = point_set.subsample(config.initial_axis.sample_size)
+    normals = patch_normals(sample.points, config.initial_axis.points_per_patch)
+
+    if len(normals) >= 3:
+        eigenvalues, eigenvectors = np.linalg.eigh(normals.T @ normals)
+        if eigenvalues[1] > 0:
+            # Standard error of the axis direction from the spread of the normals along it
+            uncertainty = float(np.arctan(np.sqrt(max(eigenvalues[0], 0) / eigenvalues[1] / len(normals))))
+            cone = config.initial_axis.safety * uncertainty
+            if cone < first_step:
+                return eigenvectors[:, 0], cone
+
+    # Fall back to the principal axes of the points, good enough to skip only the first step
+    eigenvalues, eigenvectors = point_set.principal_axes
+    if eigenvalues[1] <= 0:
+        return None
+    if eigenvalues[2] > _TUBE_ELONGATION * eigenvalues[1] and eigenvalues[0] > _TUBE_ROUNDNESS * eigenvalues[1]:
+        return eigenvectors[:, 2], first_step
+    if eigenvalues[0] < _RING_FLATNESS * eigenvalues[1] and eigenvalues[1] > _RING_ROUNDNESS * eigenvalues[2]:
+        return eigenvectors[:, 0], first_step
+    return None
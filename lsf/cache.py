@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import os
+import copy
+import pickle
+import hashlib
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+import numpy as np
+import logging
+
+from lsf.pointset import PointSet
+from config import config
+
+logger = logging.getLogger("LSF")
+
+# Arguments not changing the fitted object
+_IGNORED_ARGUMENTS = ("points", "cancel")
+
+
+class CacheStats(NamedTuple):
+    """Number of lookups of the fit cache by their outcome"""
+    hits: int
+    disk_hits: int
+    misses: int
+    size: int  # Number of results held in memory
+
+
+def _argument_key(value) -> bytes:
+    """Represent a fitting function argument as bytes, arrays by their values"""
+    if isinstance(value, (np.ndarray, list, tuple)):
+        array = np.asarray(value, dtype = float)
+        return repr(array.shape).encode() + array.tobytes()
+    return repr(value).encode()
+
+
+class FitCache:
+    """
+    Least recently used cache of fit results keyed by the fingerprint of the points and the fitting parameters.
+    Results are optionally stored on disk as well so that they survive restarts.
+    """
+
+    def __init__(self) -> None:
+        self.results: OrderedDict[str, object] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def stats(self) -> CacheStats:
+        """Return lookup counts"""
+        with self.lock:
+            return CacheStats(self.hits, self.disk_hits, self.misses, len(self.results))
+
+    def clear(self) -> None:
+        """Drop results held in memory and reset the lookup counts, results on disk are kept"""
+        with self.lock:
+            self.results.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    @staticmethod
+    def disk_path(key: str) -> None | str:
+        """Path of the file storing a result on disk, None when the disk cache is off"""
+        if not config.cache.disk_size:
+            return None
+        return os.path.join(config.cache.directory, f"{key}.pickle")
+
+    def get(self, key: str) -> tuple[bool, object]:
+        """Return whether the result is cached and the result, looking in memory first and on disk second"""
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                self.hits += 1
+                return True, self.results[key]
+
+        path = self.disk_path(key)
+        if path is not None and os.path.isfile(path):
+            try:
+                with open(path, "rb") as file:
+                    result = pickle.load(file)
+            except (OSError, pickle.PickleError, EOFError) as e:
+                logger.debug(f"Cached fit {path} couldn't be read: {e}")
+            else:
+                os.utime(path)
+                self.store(key, result, write = False)
+                with self.lock:
+                    self.disk_hits += 1
+                return True, result
+
+        with self.lock:
+            self.misses += 1
+        return False, None
+
+    def store(self, key: str, result, write: bool = True) -> None:
+        """Store result in memory evicting the least recently used results, and on disk when enabled"""
+        with self.lock:
+            self.results[key] = result
+            self.results.move_to_end(key)
+            while len(self.results) > config.cache.size:
+                self.results.popitem(last = False)
+
+        path = self.disk_path(key)
+        if write and path is not None:
+            try:
+                self.write(path, result)
+            except OSError as e:
+                logger.debug(f"Fit couldn't be cached on disk: {e}")
+
+    @staticmethod
+    def write(path: str, result) -> None:
+        """Write result to disk and remove the least recently used files over the disk cache size"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok = True)
+
+        # Write to a temporary file first so that a concurrent reader never sees a partial file
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as file:
+            pickle.dump(result, file, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+
+        files = [entry for entry in os.scandir(directory) if entry.name.endswith(".pickle")]
+        if len(files) > config.cache.disk_size:
+            files.sort(key = lambda entry: entry.stat().st_mtime)
+            for entry in files[:len(files) - config.cache.disk_size]:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+fit_cache = FitCache()
+
+
+def memoize(fitting_object: str, config_keys: tuple[str, ...] = ()) -> Callable:
+    """
+    Cache results of a fitting function. Key is made of the fingerprint of the points, the other arguments and the
+    configuration options the function depends on. Points are passed to the function as a point set.
+    """
+    config_keys = ("quality",) + config_keys
+
+    def decorator(fitting_function: Callable) -> Callable:
+        signature = inspect.signature(fitting_function)
+
+        @functools.wraps(fitting_function)
+        def wrapper(points, *args, **kwargs):
+            point_set = PointSet.of(points)
+            if config.cache.size <= 0 and not config.cache.disk_size:
+                return fitting_function(point_set, *args, **kwargs)
+
+            arguments = signature.bind(point_set, *args, **kwargs)
+            arguments.apply_defaults()
+
+            digest = hashlib.blake2b(digest_size = 20)
+            digest.update(fitting_object.encode())
+            digest.update(point_set.fingerprint.encode())
+            digest.update(repr(point_set.reduction).encode())
+            for name, value in arguments.arguments.items():
+                if name not in _IGNORED_ARGUMENTS:
+                    digest.update(name.encode() + _argument_key(value))
+            for config_key in config_keys:
+                digest.update(repr(config[config_key]).encode())
+            key = digest.hexdigest()
+
+            # Callers get their own copy of the cached result to modify
+            found, result = fit_cache.get(key)
+            if found:
+                logger.debug(f"Using cached {fitting_object} fit")
+                return copy.deepcopy(result)
+
+            result = fitting_function(point_set, *args, **kwargs)
+            fit_cache.store(key, copy.deepcopy(result))
+            return result
+
+        return wrapper
+
+    return decorator
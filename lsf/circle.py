@@ -1,37 +1,75 @@
+from __future__ import annotations
+
 import numpy as np
 import numpy.typing as npt
 import logging
 
 from lsf import plane
+from lsf.pointset import PointSet
+from lsf import cache, residuals
 from config import lang
 
 
 logger = logging.getLogger("LSF")
 
 
-def fit_circle(points: npt.ArrayLike):
-    """Fit specified points by a circle in 3D"""
-    logger.info(lang.info.circle_fitting)
+def solve_circle(plane_cs: npt.NDArray, m2: npt.NDArray, m3: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray]:
+    """
+    Solve normal equations of the least squares problem [x, y, 1] @ c = x^2 + y^2 for points in the plane coordinate
+    system given by their central moments. Return the solution and the right-hand side. Inputs may be stacked along
+    leading axes.
+    """
+    # Transform moments to the plane coordinate system
+    plane_m2 = plane_cs @ m2 @ np.swapaxes(plane_cs, -1, -2)
+    plane_m3 = np.einsum("...ai,...bj,...ck,...ijk->...abc", plane_cs, plane_cs, plane_cs, m3)
 
-    mean = np.mean(points, axis = 0)
-    centered_points = points - mean
+    # Points are centered so the sums of x and y are zero
+    A = np.zeros(plane_m2.shape)
+    A[..., :2, :2] = plane_m2[..., :2, :2]
+    A[..., 2, 2] = 1
+    b = np.stack([
+        plane_m3[..., 0, 0, 0] + plane_m3[..., 0, 1, 1],
+        plane_m3[..., 1, 0, 0] + plane_m3[..., 1, 1, 1],
+        plane_m2[..., 0, 0] + plane_m2[..., 1, 1]
+    ], axis = -1)
 
-    # Calculate plane normal and transform points to the plane coordinate system
-    plane_normal = plane.plane_normal(centered_points)
-    plane_cs = plane.plane_coordinate_system(plane_normal)
-    plane_points = plane_cs @ centered_points.T
+    c = np.linalg.solve(A, b[..., None])[..., 0]
+    return c, b
+
+
+def circle_parameters(plane_cs: npt.NDArray, c: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray]:
+    """Return center (relative to the centroid) and radius of the circle given by the solution of solve_circle"""
+    local_center = np.stack([c[..., 0] / 2, c[..., 1] / 2, np.zeros(c.shape[:-1])], axis = -1)
+    r = np.sqrt(c[..., 2] + (c[..., 0] / 2) ** 2 + (c[..., 1] / 2) ** 2)
 
-    # Fit circle
-    x, y, _ = plane_points
-    A = np.array([x, y, np.ones(len(x))]).T
-    b = x ** 2 + y ** 2
+    center = np.einsum("...ji,...j->...i", plane_cs, local_center)
+    return center, r
 
-    c = np.linalg.lstsq(A, b, rcond = None)[0]
-    local_center = np.array([c[0] / 2, c[1] / 2, 0])
-    r = np.sqrt(c[2] + (c[0] / 2) ** 2 + (c[1] / 2) ** 2)
 
-    plane_cs_inv = np.linalg.inv(plane_cs)
-    center = (plane_cs_inv @ local_center).T
-    center += mean
+@cache.memoize("circle")
+def fit_circle(points: npt.ArrayLike | PointSet, report: bool = False):
+    """
+    Fit specified points by a circle in 3D.
+    When report is requested return also the quality of the fit.
+    """
+    logger.info(lang.info.circle_fitting)
+
+    point_set = PointSet.of(points)
+    m2, m3, m4 = point_set.central_moments
+
+    # Calculate plane normal and fit circle in the plane coordinate system
+    plane_normal = point_set.principal_axes[1][:, 0]
+    plane_cs = plane.plane_coordinate_system(plane_normal)
+    c, b = solve_circle(plane_cs, m2, m3)
+    center, r = circle_parameters(plane_cs, c)
+    center += point_set.mean
+
+    if report:
+        # Mean squared algebraic residual of the normal equations at the solution is E[b^2] - c @ b
+        plane_m4 = np.einsum("ai,bj,ck,dl,ijkl->abcd", plane_cs, plane_cs, plane_cs, plane_cs, m4)
+        b_sqr = plane_m4[0, 0, 0, 0] + 2 * plane_m4[0, 0, 1, 1] + plane_m4[1, 1, 1, 1]
+        objective = b_sqr - np.dot(c, b)
 
+        distances = residuals.circle_distances(point_set.points, plane_normal, center, r)
+        return plane_normal, center, r, residuals.fit_report(distances, objective, point_set.reduction)
     return plane_normal, center, r
@@ -1,22 +1,46 @@
 from __future__ import annotations
 
 from functools import partial
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import numpy.typing as npt
-from typing import Callable
+from typing import Callable, NamedTuple
 import logging
 
+from lsf.pointset import PointSet
+from lsf import moments as mom
+from lsf import axis_estimate, cache, residuals, schedule
 from config import config, lang
 
 logger = logging.getLogger("LSF")
 
 
+# Range of spherical angles phi and theta covering all axis directions
+_HEMISPHERE = (0, np.pi / 2, 0, np.pi * 2)
+# Tolerance of the number of angle steps fitting in a range
+_ROUNDING = 1e-9
+# Batched axis search evaluates a grid of (2 * _BATCH_GRID + 1)^2 axes refined _BATCH_GRID times each level
+_BATCH_GRID = 4
+# Widening of a searched cone when its best axis lies on the boundary
+_BATCH_WIDENING = 2
+_BATCH_MAX_WIDENINGS = 5
+# Searches started around an estimated axis end early only after this many successive steps stop improving, the error
+# of short arcs keeps dropping slowly after a step improving it less than its noise floor
+_ESTIMATE_PATIENCE = 2
+
+
+class FitCancelledError(Exception):
+    """Exception when cylinder fitting is cancelled before it finishes"""
+
+
 def get_normals_in_range(phi_0: float, phi_1: float, theta_0: float, theta_1: float, step: float) -> \
         tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
     """Calculate vectors for a given segment of a sphere"""
     # Make sure number of steps is odd so that midpoint of the range is included in the angles
-    phi_steps = int((phi_1 - phi_0) / 2 / step) * 2 + 1
-    theta_steps = int((theta_1 - theta_0) / 2 / step) * 2 + 1
+    # Ranges that are a whole multiple of the step mustn't lose an angle to rounding
+    phi_steps = int((phi_1 - phi_0) / 2 / step + _ROUNDING) * 2 + 1
+    theta_steps = int((theta_1 - theta_0) / 2 / step + _ROUNDING) * 2 + 1
 
     phi = np.linspace(phi_0, phi_1, phi_steps)
     theta = np.linspace(theta_0, theta_1, theta_steps, endpoint = False)
@@ -35,37 +59,6 @@ def get_normals_in_range(phi_0: float, phi_1: float, theta_0: float, theta_1: fl
     return normals, phi, theta
 
 
-def preprocess(points: npt.ArrayLike) -> \
-        tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
-    """Precalculate values from a list of points"""
-    mean = np.average(points, axis = 0)
-    x = points - mean
-
-    delta = np.ones((points.shape[0], 6))
-    delta[:, 0] = x[:, 0] ** 2
-    delta[:, 1] = 2 * x[:, 0] * x[:, 1]
-    delta[:, 2] = 2 * x[:, 0] * x[:, 2]
-    delta[:, 3] = x[:, 1] ** 2
-    delta[:, 4] = 2 * x[:, 1] * x[:, 2]
-    delta[:, 5] = x[:, 2] ** 2
-
-    mu = np.average(delta, axis = 0)
-    delta[:] -= mu
-
-    f0 = np.zeros((3, 3))
-    f1 = np.zeros((3, 6))
-    f2 = np.zeros((6, 6))
-    for x_i, d_i in zip(x, delta):
-        f0 += np.outer(x_i, x_i)
-        f1 += np.outer(x_i, d_i)
-        f2 += np.outer(d_i, d_i)
-    f0 /= len(x)
-    f1 /= len(x)
-    f2 /= len(x)
-
-    return mean, x, mu, f0, f1, f2
-
-
 def fit_cylinder_to_axis(w: npt.NDArray, num_points: int, mu: npt.NDArray, f0: npt.NDArray, f1: npt.NDArray,
                          f2: npt.NDArray) -> tuple[float, float, npt.NDArray, npt.NDArray]:
     """For a given axis try fitting a cylinder and return its parameters along with total error"""
@@ -81,7 +74,7 @@ def fit_cylinder_to_axis(w: npt.NDArray, num_points: int, mu: npt.NDArray, f0: n
     hat_aa = hat_a @ a
 
     q = hat_a / np.trace(hat_aa)
-    p_triangle = p[np.triu_indices(3)]
+    p_triangle = p[mom._TRIANGLE]
     alpha = f1 @ p_triangle
     beta = q @ alpha
 
@@ -94,60 +87,498 @@ def fit_cylinder_to_axis(w: npt.NDArray, num_points: int, mu: npt.NDArray, f0: n
     return error, r_sqr, center, w
 
 
-def fit_cylinder_in_range(fit_cylinder_partial: Callable, normals: npt.NDArray):
-    """Fit cylinder along specified normal vectors and find the best one"""
-    results = [fit_cylinder_partial(normal) for normal in normals]
+def fit_cylinder_to_axes(w: npt.NDArray, num_points: int, mu: npt.NDArray, f0: npt.NDArray, f1: npt.NDArray,
+                         f2: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """
+    Fit cylinders along many axes at once, axes and moments may be stacked along leading axes that broadcast together.
+    Return error, squared radius and center of each cylinder as fit_cylinder_to_axis does. Calculations keep the
+    precision of the axes and moments.
+    """
+    i, j = mom._TRIANGLE
+    p = np.identity(3, dtype = w.dtype) - w[..., :, None] * w[..., None, :]
+    zeros = np.zeros(w.shape[:-1], dtype = w.dtype)
+    s = np.stack([
+        np.stack([zeros, -w[..., 2], w[..., 1]], axis = -1),
+        np.stack([w[..., 2], zeros, -w[..., 0]], axis = -1),
+        np.stack([-w[..., 1], w[..., 0], zeros], axis = -1)
+    ], axis = -2)
 
-    # Get cylinder with the smallest error
-    best_cylinder = min(results, key = lambda item: item[0])
-    best_index = results.index(best_cylinder)
-    _, r_sqr, center, normal = best_cylinder
+    a = p @ f0 @ p
+    hat_a = -(s @ a @ s)
+    hat_aa = hat_a @ a
 
-    return best_index, r_sqr, center, normal
+    q = hat_a / np.trace(hat_aa, axis1 = -2, axis2 = -1)[..., None, None]
+    p_triangle = p[..., i, j]
+    alpha = np.einsum("...ij,...j->...i", f1, p_triangle)
+    beta = np.einsum("...ij,...j->...i", q, alpha)
 
+    error = (np.einsum("...i,...ij,...j->...", p_triangle, f2, p_triangle)
+             - 4 * np.einsum("...i,...i->...", alpha, beta)
+             + 4 * np.einsum("...i,...ij,...j->...", beta, f0, beta))
+    error /= num_points
+    r_sqr = np.einsum("...i,...i->...", p_triangle, mu) + np.einsum("...i,...i->...", beta, beta)
 
-def fit_cylinder(points: npt.ArrayLike) -> tuple[npt.NDArray, float, npt.NDArray, float]:
-    """Fit cylinder through a set of points"""
-    # Prepare data
-    mean, centered_points, mu, f0, f1, f2 = preprocess(points)
-    fit_cylinder_partial = partial(fit_cylinder_to_axis, num_points = len(points), mu = mu, f0 = f0, f1 = f1, f2 = f2)
+    return error, r_sqr, beta
 
-    # Fit cylinders in steps
-    phi_0 = 0
-    phi_1 = np.pi / 2
-    theta_0 = 0
-    theta_1 = np.pi * 2
-    r_sqr, center, normal = 0, 0, np.zeros(3)
 
-    for i, angle_step in enumerate(config.cylinder_angle_steps):
-        logger.info(f"{lang.info.cylinder_fitting} ({i + 1}/{len(config.cylinder_angle_steps)})")
+def fit_cylinder_in_range(fit_cylinder_partial: Callable, normals: npt.NDArray):
+    """Fit cylinder along specified normal vectors and find the best one"""
+    results = [fit_cylinder_partial(normal) for normal in normals]
 
+    # Get cylinder with the smallest error
+    best_cylinder = min(results, key = lambda item: item[0])
+    best_index = results.index(best_cylinder)
+    error, r_sqr, center, normal = best_cylinder
+
+    return best_index, error, r_sqr, center, normal
+
+
+def axis_fitter(point_set: PointSet) -> Callable:
+    """Return function fitting a cylinder to the point set along a given axis"""
+    mu, f0, f1, f2 = point_set.cylinder_moments
+    return partial(fit_cylinder_to_axis, num_points = len(point_set), mu = mu, f0 = f0, f1 = f1, f2 = f2)
+
+
+def batch_fitter(point_set: PointSet, rotation: npt.NDArray | None = None, dtype: npt.DTypeLike = np.float32) -> \
+        Callable:
+    """
+    Return function fitting cylinders to the point set along many axes at once in the given precision and returning
+    the best one as fit_cylinder_in_range does. Axes are given in a coordinate system rotated by the rotation matrix.
+    """
+    mu, f0, f1, f2 = (np.asarray(item, dtype = dtype) for item in point_set.cylinder_moments)
+    num_points = len(point_set)
+
+    def fit(normals: npt.NDArray) -> tuple[int, float, float, npt.NDArray, npt.NDArray]:
+        w = (normals if rotation is None else normals @ rotation.T).astype(dtype)
+        error, r_sqr, center = fit_cylinder_to_axes(w, num_points, mu, f0, f1, f2)
+        best = int(np.argmin(error))
+        return best, float(error[best]), float(r_sqr[best]), center[best].astype(float), w[best].astype(float)
+
+    return fit
+
+
+class SearchStart(NamedTuple):
+    """
+    Where the axis search starts. Region of spherical angles phi and theta is given in a coordinate system rotated by
+    the rotation matrix (identity when None) and is searched by the angle steps starting with first_level.
+    When check_boundary is set, the search is abandoned if the best axis of the first step lies on the region boundary.
+    When cone (radians) is given, searched axes are kept within the cone around the axis the rotation takes the x axis
+    to.
+    """
+    region: tuple[float, float, float, float]
+    rotation: npt.NDArray | None = None
+    first_level: int = 0
+    check_boundary: bool = False
+    cone: float | None = None
+
+
+FULL_SEARCH = SearchStart(_HEMISPHERE)
+
+
+class OutsideRegionError(Exception):
+    """Exception when the best cylinder axis lies on the boundary of the searched region"""
+
+
+def axis_rotation(axis: npt.ArrayLike) -> npt.NDArray:
+    """Rotation matrix taking the x axis, at spherical angles phi = pi/2 and theta = 0, to the given axis"""
+    axis = np.asarray(axis, dtype = float)
+    axis = axis / np.linalg.norm(axis)
+    helper = [1, 0, 0] if abs(axis[0]) < 0.9 else [0, 1, 0]
+    u = np.cross(axis, helper)
+    u /= np.linalg.norm(u)
+    return np.column_stack((axis, u, np.cross(axis, u)))
+
+
+def scan_axes(num_points: npt.ArrayLike, mu: npt.NDArray, f0: npt.NDArray, f1: npt.NDArray, f2: npt.NDArray,
+              step: float) -> npt.NDArray:
+    """
+    Return the best axis of each of many point sets, given by their moments stacked along the first axis, among all
+    directions spaced by the angle step (radians)
+    """
+    normals, _, _ = get_normals_in_range(*_HEMISPHERE, step)
+    num_points = np.broadcast_to(num_points, (len(mu),))
+    error, _, _ = fit_cylinder_to_axes(normals, num_points[:, None], mu[:, None], f0[:, None], f1[:, None],
+                                       f2[:, None])
+    return normals[np.argmin(error, axis = 1)]
+
+
+def search_axes(rotation: npt.NDArray, cone: npt.ArrayLike, num_points: npt.ArrayLike, mu: npt.NDArray,
+                f0: npt.NDArray, f1: npt.NDArray, f2: npt.NDArray, accuracy: float) -> \
+        tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
+    """
+    Search cylinder axes of many point sets at once from their moments stacked along the first axis.
+    Each axis is searched in a cone of the given half angle (radians) around the axis its rotation (see axis_rotation)
+    takes the x axis to, on a grid refined around the best axis until its step reaches the accuracy (radians). Cones
+    whose best axis of the first level lies on their boundary are widened and searched again.
+    Return axis, squared radius, center and error of each cylinder.
+    """
+    cone = np.array(cone, dtype = float)
+    count = len(cone)
+    rotation = np.broadcast_to(rotation, (count, 3, 3))
+    num_points = np.broadcast_to(num_points, (count,))
+
+    offsets = np.arange(-_BATCH_GRID, _BATCH_GRID + 1)
+    grid_phi, grid_theta = (item.ravel() for item in np.meshgrid(offsets, offsets, indexing = "ij"))
+
+    axes = np.empty((count, 3))
+    r_sqr = np.empty(count)
+    centers = np.empty((count, 3))
+    errors = np.empty(count)
+    pending = np.arange(count)
+    for widening in range(_BATCH_MAX_WIDENINGS + 1):
+        # Each point set refines its own best axis, angles are relative to the axis its rotation takes the x axis to
+        rows = np.arange(len(pending))
+        phi = np.zeros(len(pending))
+        theta = np.zeros(len(pending))
+        step = cone[pending] / _BATCH_GRID
+        levels = 1 + max(int(np.ceil(np.log(np.max(step) / accuracy) / np.log(_BATCH_GRID) - _ROUNDING)), 0)
+        inside = np.ones(len(pending), dtype = bool)
+        for level in range(levels):
+            candidate_phi = np.pi / 2 + phi[:, None] + grid_phi * step[:, None]
+            candidate_theta = theta[:, None] + grid_theta * step[:, None]
+            local_axes = np.stack([np.sin(candidate_phi) * np.cos(candidate_theta),
+                                   np.sin(candidate_phi) * np.sin(candidate_theta),
+                                   np.cos(candidate_phi)], axis = -1)
+            w = np.einsum("pij,pkj->pki", rotation[pending], local_axes)
+            error, r_sqrs, center = fit_cylinder_to_axes(w, num_points[pending, None], mu[pending, None],
+                                                         f0[pending, None], f1[pending, None], f2[pending, None])
+
+            best = np.argmin(error, axis = 1)
+            if level == 0 and widening < _BATCH_MAX_WIDENINGS:
+                inside = np.maximum(np.abs(grid_phi[best]), np.abs(grid_theta[best])) < _BATCH_GRID
+
+            phi = candidate_phi[rows, best] - np.pi / 2
+            theta = candidate_theta[rows, best]
+            step /= _BATCH_GRID
+
+        finished = pending[inside]
+        axes[finished] = w[rows, best][inside]
+        r_sqr[finished] = r_sqrs[rows, best][inside]
+        centers[finished] = center[rows, best][inside]
+        errors[finished] = error[rows, best][inside]
+
+        pending = pending[~inside]
+        if not len(pending):
+            break
+        logger.debug(f"Cylinder axes of {len(pending)} point sets lie outside the searched cones, widening the search")
+        cone[pending] *= _BATCH_WIDENING
+
+    return axes, r_sqr, centers, errors
+
+
+def cone_start(axis: npt.ArrayLike, cone: float, angle_steps: list, check_boundary: bool = True,
+               constrain: bool = False) -> SearchStart:
+    """
+    Start search in a cone of the given half angle (radians) around an axis, skipping steps too coarse for the cone.
+    The searched region is widened to span at least two of the finest steps on each side of the axis. When constrained,
+    the searched axes never leave the cone, otherwise the search may move past its boundary.
+    """
+    if cone >= np.pi / 2:
+        return FULL_SEARCH
+    constraint = cone if constrain else None
+    cone = max(cone, 2 * np.radians(angle_steps[-1]))
+
+    # Rotate the coordinate system so that the axis points to phi = pi/2, theta = 0 where angle steps are uniform
+    rotation = axis_rotation(axis)
+
+    # First step has to place at least two angles on each side of the axis to tell whether it lies inside the cone
+    first_level = next(i for i, step in enumerate(angle_steps) if 2 * np.radians(step) <= cone * (1 + 1e-9))
+    region = (np.pi / 2 - cone, np.pi / 2 + cone, -cone, cone)
+    return SearchStart(region, rotation, first_level, check_boundary, constraint)
+
+
+def widened_start(start: SearchStart, angle_steps: list) -> SearchStart:
+    """
+    Start search around the same axis as the given start in a region widened by warm_start.widening. Axes constrained
+    to a cone are searched in the same region again, the whole cone is already covered by it.
+    """
+    if start.rotation is None:
+        return start._replace(check_boundary = False)
+
+    cone = (start.region[1] - start.region[0]) / 2
+    if start.cone is None:
+        cone *= config.warm_start.widening
+    return cone_start(start.rotation[:, 0], cone, angle_steps, check_boundary = False)._replace(cone = start.cone)
+
+
+def clamp_to_cone(normals: npt.NDArray, cone: float) -> npt.NDArray:
+    """Move axes (rows) lying outside the cone of the given half angle (radians) around the x axis onto its boundary"""
+    outside = normals[:, 0] < np.cos(cone)
+    if not np.any(outside):
+        return normals
+
+    normals = normals.copy()
+    sideways = normals[outside, 1:]
+    sideways /= np.maximum(np.linalg.norm(sideways, axis = 1), np.finfo(float).tiny)[:, None]
+    normals[outside, 0] = np.cos(cone)
+    normals[outside, 1:] = np.sin(cone) * sideways
+    return normals
+
+
+def rotated(fit_cylinder_partial: Callable, rotation: npt.NDArray | None) -> Callable:
+    """Return axis fitting function taking axes in a rotated coordinate system"""
+    if rotation is None:
+        return fit_cylinder_partial
+    return lambda w: fit_cylinder_partial(rotation @ w)
+
+
+def coarse_fitter(point_set: PointSet, rotation: npt.NDArray | None, mixed_precision: bool) -> None | Callable:
+    """Return float32 batch fitter of the coarse search steps when the search uses mixed precision"""
+    return batch_fitter(point_set, rotation) if mixed_precision else None
+
+
+def search_axis(fit_cylinder_partial: Callable, angle_steps: list, region: tuple[float, float, float, float],
+                cancel: threading.Event | None = None, first_level: int = 0, total_levels: int | None = None,
+                check_boundary: bool = False, stop: Callable | None = None, coarse_fitter: Callable | None = None,
+                cone: float | None = None) -> \
+        tuple[float, float, npt.NDArray, npt.NDArray, tuple[float, float, float, float]]:
+    """
+    Search for the best cylinder axis in steps, each step searching around the best axis of the previous one.
+    Region is given by the range of spherical angles phi and theta. Return the best cylinder and the region to search in
+    by the next step. Axes of every step are kept within the cone (radians) around the x axis when it is given.
+    Search ends early when stop called with the angle step (in degrees), error, r_sqr and axis of a step returns True.
+    Coarse fitter (see batch_fitter) ranks the axes of the steps of at least precision.float32_step degrees, except for
+    the last step, which is always fitted by fit_cylinder_partial.
+    """
+    total_levels = len(angle_steps) if total_levels is None else total_levels
+    phi_0, phi_1, theta_0, theta_1 = region
+    error, r_sqr, center, normal = 0, 0, 0, np.zeros(3)
+
+    for i, angle_step in enumerate(angle_steps):
+        if cancel is not None and cancel.is_set():
+            raise FitCancelledError("Cylinder fitting cancelled")
+        logger.info(f"{lang.info.cylinder_fitting} ({first_level + i + 1}/{total_levels})")
+
+        coarse = coarse_fitter is not None and angle_step >= config.precision.float32_step and \
+            i < len(angle_steps) - 1
         angle_step = float(np.radians(angle_step))
 
         # Find best cylinder in range
         normal_vectors, phi, theta = get_normals_in_range(phi_0, phi_1, theta_0, theta_1, angle_step)
-        best_index, r_sqr, center, normal = fit_cylinder_in_range(fit_cylinder_partial, normal_vectors)
+        if cone is not None:
+            normal_vectors = clamp_to_cone(normal_vectors, cone)
+        if coarse:
+            best_index, error, r_sqr, center, normal = coarse_fitter(normal_vectors)
+        else:
+            best_index, error, r_sqr, center, normal = fit_cylinder_in_range(fit_cylinder_partial, normal_vectors)
 
         # Calculate new range to search in
-        if i < len(config.cylinder_angle_steps) - 1:
-            # index of best phi and best theta comes from the list comprehensions with two loops 
-            best_phi = phi[best_index // len(theta)]
-            best_theta = theta[best_index % len(theta)]
-
-            phi_0 = best_phi - angle_step
-            phi_1 = best_phi + angle_step
-            theta_0 = best_theta - angle_step
-            theta_1 = best_theta + angle_step
+        # index of best phi and best theta comes from the list comprehensions with two loops
+        phi_index, theta_index = divmod(best_index, len(theta))
+        if check_boundary and i == 0 and (phi_index in (0, len(phi) - 1) or theta_index in (0, len(theta) - 1)):
+            raise OutsideRegionError("Best cylinder axis lies on the boundary of the searched region")
+        best_phi = phi[phi_index]
+        best_theta = theta[theta_index]
+
+        phi_0 = best_phi - angle_step
+        phi_1 = best_phi + angle_step
+        theta_0 = best_theta - angle_step
+        theta_1 = best_theta + angle_step
+
+        # Errors of the coarse steps are too imprecise to decide the search is finished
+        if stop is not None and not coarse and stop(np.degrees(angle_step), error, r_sqr, normal):
+            logger.debug(f"Cylinder axis search stopped at {np.degrees(angle_step)} degree step")
+            break
+
+    return error, r_sqr, center, normal, (phi_0, phi_1, theta_0, theta_1)
+
+
+def search_multiresolution(point_set: PointSet, angle_steps: list, start: SearchStart,
+                           cancel: threading.Event | None = None, new_stop: Callable | None = None,
+                           mixed_precision: bool = False) -> tuple[float, float, npt.NDArray, npt.NDArray]:
+    """
+    Search for the best cylinder axis using a subsample of the points for the coarse steps.
+    Moments of all points are calculated in the background while the coarse steps run.
+    Fall back to searching with all points around the start widened by widened_start when the axis moves too much once
+    all points are used.
+    """
+    # At least the last step uses all points
+    steps = angle_steps[start.first_level:]
+    coarse_levels = sum(step >= config.multires.full_resolution_step for step in steps[:-1])
+    coarse_steps = steps[:coarse_levels]
+    fine_steps = steps[coarse_levels:]
+    full_levels = len(fine_steps)
+    region = start.region
+
+    coarse_normal = None
+    if coarse_steps:
+        sample = point_set.subsample(config.multires.sample_size)
+        with ThreadPoolExecutor(max_workers = 1) as executor:
+            full_moments = executor.submit(lambda: point_set.cylinder_moments)
+            *_, coarse_normal, region = search_axis(rotated(axis_fitter(sample), start.rotation), coarse_steps,
+                                                    region, cancel, start.first_level, len(angle_steps),
+                                                    start.check_boundary,
+                                                    coarse_fitter = coarse_fitter(sample, start.rotation,
+                                                                                  mixed_precision),
+                                                    cone = start.cone)
+            full_moments.result()
+
+    error, r_sqr, center, normal, _ = search_axis(rotated(axis_fitter(point_set), start.rotation), fine_steps, region,
+                                                  cancel, len(angle_steps) - full_levels, len(angle_steps),
+                                                  start.check_boundary and not coarse_steps,
+                                                  new_stop() if new_stop is not None else None,
+                                                  coarse_fitter(point_set, start.rotation, mixed_precision), start.cone)
+
+    # Axis orientation doesn't matter
+    if coarse_normal is not None:
+        deviation = np.arccos(np.clip(abs(np.dot(normal, coarse_normal)), 0, 1))
+        if deviation > config.multires.max_deviation * np.radians(coarse_steps[-1]):
+            logger.debug(f"Subsampled cylinder axis deviates by {np.degrees(deviation)} degrees, searching all points")
+            error, r_sqr, center, normal = search(point_set, angle_steps, widened_start(start, angle_steps), cancel,
+                                                  False, new_stop, mixed_precision)
+
+    return error, r_sqr, center, normal
+
+
+def search(point_set: PointSet, angle_steps: list, start: SearchStart, cancel: threading.Event | None = None,
+           multiresolution: bool = False, new_stop: Callable | None = None, mixed_precision: bool = False) -> \
+        tuple[float, float, npt.NDArray, npt.NDArray]:
+    """
+    Search for the best cylinder axis from the given start. Every search gets its own function ending it early created
+    by new_stop (see angle_schedule).
+    """
+    if multiresolution:
+        return search_multiresolution(point_set, angle_steps, start, cancel, new_stop, mixed_precision)
+
+    fit_cylinder_partial = rotated(axis_fitter(point_set), start.rotation)
+    error, r_sqr, center, normal, _ = search_axis(fit_cylinder_partial, angle_steps[start.first_level:], start.region,
+                                                  cancel, start.first_level, len(angle_steps), start.check_boundary,
+                                                  new_stop() if new_stop is not None else None,
+                                                  coarse_fitter(point_set, start.rotation, mixed_precision), start.cone)
+    return error, r_sqr, center, normal
+
+
+def angle_schedule(point_set: PointSet, tuned: bool) -> tuple[list, Callable | None]:
+    """
+    Return angle steps of the axis search and the function creating a function ending a search early, each search needs
+    its own as it remembers the errors of the previous steps.
+    Tuned steps reach angle_schedule.target_accuracy with the least evaluated axes and the search ends once the steps
+    are finer than the accuracy of the axis supported by the noise of the points and the error stops improving by more
+    than its noise floor, for patience successive steps.
+    """
+    if not tuned:
+        return config.cylinder_angle_steps, None
+
+    angle_steps = schedule.tuned_angle_steps(config.cylinder_angle_steps[0], config.angle_schedule.target_accuracy,
+                                             config.angle_schedule.min_ratio, config.angle_schedule.max_ratio)
+
+    def new_stop(patience: int = 1) -> Callable:
+        previous_error = np.inf
+        settled = 0
+
+        def stop(angle_step: float, error: float, r_sqr: float, normal: npt.NDArray) -> bool:
+            nonlocal previous_error, settled
+            improvement, previous_error = previous_error - error, error
+            if (angle_step <= schedule.axis_accuracy(point_set, error, r_sqr, normal) and
+                    improvement <= schedule.error_noise_floor(error, len(point_set))):
+                settled += 1
+            else:
+                settled = 0
+            return settled >= patience
+
+        return stop
+
+    return angle_steps, new_stop
+
+
+def warm_search(point_set: PointSet, angle_steps: list, prior: npt.NDArray, cancel: threading.Event | None = None,
+                multiresolution: bool = False, new_stop: Callable | None = None, mixed_precision: bool = False) -> \
+        tuple[float, float, npt.NDArray, npt.NDArray]:
+    """
+    Search for the best cylinder axis in a small cone around a prior axis. The cone is widened as long as the best axis
+    lies on its boundary, up to searching all directions.
+    """
+    cone = np.radians(config.warm_start.cone)
+    while True:
+        start = cone_start(prior, cone, angle_steps)
+        try:
+            return search(point_set, angle_steps, start, cancel, multiresolution, new_stop, mixed_precision)
+        except OutsideRegionError:
+            logger.debug(f"Cylinder axis lies outside {np.degrees(cone)} degrees of the prior axis, widening search")
+            cone *= config.warm_start.widening
+
+
+@cache.memoize("cylinder", ("cylinder_angle_steps", "angle_schedule", "initial_axis", "multires", "warm_start",
+                            "precision"))
+def fit_cylinder(points: npt.ArrayLike | PointSet, cancel: threading.Event | None = None, report: bool = False,
+                 multiresolution: bool | None = None, estimate_axis: bool | None = None,
+                 axis: npt.ArrayLike | None = None, axis_tolerance: float = 0.0, tuned: bool | None = None,
+                 prior: npt.ArrayLike | None = None, mixed_precision: bool | None = None) -> \
+        tuple[npt.NDArray, float, npt.NDArray, float] | tuple[npt.NDArray, float, npt.NDArray, float,
+                                                              residuals.FitReport]:
+    """
+    Fit cylinder through a set of points. Setting the cancel event stops the fitting before the next search step.
+    When report is requested return also the quality of the fit.
+    Multiresolution search runs the coarse steps on a subsample of the points, by default it is used for point sets
+    of at least multires.min_points points.
+    With axis estimation the search starts in a cone around an axis estimated from the points instead of scanning all
+    directions, by default it is controlled by initial_axis.enabled.
+    When an axis is given, the cylinder axis is searched only within axis_tolerance degrees of it, or fixed to it
+    exactly when the tolerance is 0.
+    Tuned search picks its own angle steps instead of cylinder_angle_steps, by default it is controlled by
+    angle_schedule.tuned.
+    Prior axis, typically of a previous fit of a slightly different selection, starts the search in a small cone around
+    it instead of estimating the axis.
+    Mixed precision search ranks the axes of the coarse steps in float32, the fine steps and the final cylinder are
+    calculated in float64, by default it is controlled by precision.mixed.
+    """
+    point_set = PointSet.of(points)
+    if tuned is None:
+        tuned = bool(config.angle_schedule.tuned)
+    angle_steps, new_stop = angle_schedule(point_set, tuned)
+    if multiresolution is None:
+        multiresolution = 0 < config.multires.min_points <= len(point_set)
+    if estimate_axis is None:
+        estimate_axis = bool(config.initial_axis.enabled)
+    if mixed_precision is None:
+        mixed_precision = config.precision.mixed
+
+    if axis is not None:
+        axis = np.asarray(axis, dtype = float)
+        axis = axis / np.linalg.norm(axis)
+
+    if axis is not None and axis_tolerance <= 0:
+        # Fixed axis leaves only the center and radius to be solved
+        error, r_sqr, center, normal = axis_fitter(point_set)(axis)
+    elif axis is not None:
+        # Axis constrained by the user isn't rejected when the best axis lies on the boundary of the tolerance
+        start = cone_start(axis, np.radians(axis_tolerance), angle_steps, check_boundary = False, constrain = True)
+        error, r_sqr, center, normal = search(point_set, angle_steps, start, cancel, multiresolution, new_stop,
+                                              mixed_precision)
+    elif prior is not None:
+        error, r_sqr, center, normal = warm_search(point_set, angle_steps, np.asarray(prior, dtype = float), cancel,
+                                                   multiresolution, new_stop, mixed_precision)
+    else:
+        # Start the search around an axis estimated from the points when the estimate is reliable
+        start = FULL_SEARCH
+        start_stop = new_stop
+        if estimate_axis:
+            estimate = axis_estimate.estimate_axis(point_set, np.radians(angle_steps[0]))
+            if estimate is not None:
+                start = cone_start(*estimate, angle_steps)
+                if new_stop is not None:
+                    start_stop = partial(new_stop, _ESTIMATE_PATIENCE)
+
+        # Fit cylinders in steps
+        try:
+            error, r_sqr, center, normal = search(point_set, angle_steps, start, cancel, multiresolution, start_stop,
+                                                  mixed_precision)
+        except OutsideRegionError:
+            logger.debug("Estimated cylinder axis rejected, searching all directions")
+            error, r_sqr, center, normal = search(point_set, angle_steps, FULL_SEARCH, cancel, multiresolution,
+                                                  new_stop, mixed_precision)
 
     # Offset cylinder back to its original position
-    center += mean
+    center = center + point_set.mean
 
     # Calculate end point and length of the cylinder
-    distances = np.dot(centered_points, normal)
-    min_distance = np.min(distances)
-    max_distance = np.max(distances)
+    min_distance, max_distance = point_set.extent_along(normal)
 
     end_point = center + normal * min_distance
     length = max_distance - min_distance
+    radius = np.sqrt(r_sqr)
 
-    return normal, np.sqrt(r_sqr), end_point, length
+    if report:
+        distances = residuals.cylinder_distances(point_set.points, normal, radius, end_point)
+        return normal, radius, end_point, length, residuals.fit_report(distances, error, point_set.reduction)
+    return normal, radius, end_point, length
@@ -1,26 +1,39 @@
+from __future__ import annotations
+
 import numpy as np
 import numpy.typing as npt
 import logging
 
+from lsf.pointset import PointSet
+from lsf import cache, residuals
 from config import lang
 
 logger = logging.getLogger("LSF")
 
 
-def fit_line(points: npt.ArrayLike) -> tuple[npt.NDArray, npt.NDArray]:
-    """Calculate best fit line through set of points"""
+@cache.memoize("line")
+def fit_line(points: npt.ArrayLike | PointSet, report: bool = False) -> \
+        tuple[npt.NDArray, npt.NDArray] | tuple[npt.NDArray, npt.NDArray, residuals.FitReport]:
+    """
+    Calculate best fit line through set of points.
+    When report is requested return also the quality of the fit.
+    """
     logger.info(lang.info.line_fitting)
 
-    mean = np.mean(points, axis = 0)
+    point_set = PointSet.of(points)
 
-    uu, dd, vv = np.linalg.svd(points - mean)
-    axis = vv[0]
+    # Line axis is the eigenvector corresponding to the largest eigenvalue of the scatter matrix
+    axis = point_set.principal_axes[1][:, -1]
 
-    min_coords = np.min(points, axis = 0)
-    max_coords = np.max(points, axis = 0)
+    min_coords, max_coords = point_set.bounds
     distance = np.linalg.norm(max_coords - min_coords)
 
-    start_point = mean - axis * distance / 2
-    end_point = mean + axis * distance / 2
+    start_point = point_set.mean - axis * distance / 2
+    end_point = point_set.mean + axis * distance / 2
 
+    if report:
+        # Mean squared distance from the line is the sum of the two lesser eigenvalues of the scatter matrix
+        distances = residuals.line_distances(point_set.points, point_set.mean, point_set.mean + axis)
+        objective = np.sum(point_set.principal_axes[0][:2])
+        return start_point, end_point, residuals.fit_report(distances, objective, point_set.reduction)
     return start_point, end_point
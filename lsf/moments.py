@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import numpy.typing as npt
+
+from config import config
+
+# Upper triangle of a symmetric 3x3 matrix in the order used by the cylinder fitting together with the weights of the
+# products (off-diagonal products appear twice in the full matrix)
+_TRIANGLE = np.triu_indices(3)
+_TRIANGLE_WEIGHTS = np.array([1, 2, 2, 1, 2, 1])
+
+
+def power_sums(points: npt.NDArray, order: int = 4) -> tuple[npt.NDArray, ...]:
+    """Calculate sums of the first to the given order (at most fourth) tensor powers of the points"""
+    points = np.asarray(points, dtype = float).reshape(-1, 3)
+    sums = (np.sum(points, axis = 0), points.T @ points)
+    if order <= 2:
+        return sums[:order]
+
+    squares = (points[:, :, None] * points[:, None, :]).reshape(-1, 9)
+    s3 = (squares.T @ points).reshape(3, 3, 3)
+    if order == 3:
+        return sums + (s3,)
+    return sums + (s3, (squares.T @ squares).reshape(3, 3, 3, 3))
+
+
+# Thread pool shared by all moment calculations and its number of threads
+_executor: ThreadPoolExecutor | None = None
+_executor_threads = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(threads: int) -> ThreadPoolExecutor:
+    """
+    Return the shared thread pool with the given number of threads. When the number changes the pool is replaced,
+    the old one finishes the work already submitted to it and shuts down.
+    """
+    global _executor, _executor_threads
+    with _executor_lock:
+        if _executor is None or _executor_threads != threads:
+            if _executor is not None:
+                _executor.shutdown(wait = False)
+            _executor = ThreadPoolExecutor(max_workers = threads, thread_name_prefix = "moments")
+            _executor_threads = threads
+        return _executor
+
+
+def chunked_power_sums(points: npt.NDArray, order: int = 4, shift: npt.ArrayLike | None = None,
+                       threads: int | None = None) -> tuple[npt.NDArray, ...]:
+    """
+    Calculate power_sums of the points shifted by -shift in chunks of moments.chunk_size points on moments.threads
+    threads (all processors when 0). NumPy releases the interpreter lock while it goes through a chunk, so the chunks
+    are processed in parallel. Sums of the chunks are added pairwise to limit the accumulated rounding errors.
+    """
+    points = np.asarray(points, dtype = float).reshape(-1, 3)
+    threads = config.moments.threads if threads is None else threads
+    threads = threads or os.cpu_count() or 1
+    size = config.moments.chunk_size
+
+    def chunk_sums(start: int) -> tuple[npt.NDArray, ...]:
+        chunk = points[start:start + size]
+        return power_sums(chunk if shift is None else chunk - shift, order)
+
+    starts = range(0, max(len(points), 1), size)
+    if threads > 1 and len(starts) > 1:
+        sums = list(_get_executor(threads).map(chunk_sums, starts))
+    else:
+        sums = [chunk_sums(start) for start in starts]
+
+    # Pairwise summation, rounding errors grow with the logarithm of the number of chunks
+    while len(sums) > 1:
+        paired = [tuple(a + b for a, b in zip(first, second)) for first, second in zip(sums[::2], sums[1::2])]
+        sums = paired + sums[len(paired) * 2:]
+    return sums[0]
+
+
+def central_moments(count: int, s1: npt.NDArray, s2: npt.NDArray, s3: npt.NDArray | None = None,
+                    s4: npt.NDArray | None = None) -> \
+        tuple[npt.NDArray, npt.NDArray, npt.NDArray | None, npt.NDArray | None]:
+    """
+    Convert power sums to the mean and the second to fourth central moments.
+    Sums may be stacked along leading axes. Moments of orders without their power sums are None.
+    """
+    m = s1 / count
+    r2 = s2 / count
+
+    m2 = r2 - np.einsum("...a,...b->...ab", m, m)
+    if s3 is None:
+        return m, m2, None, None
+
+    r3 = s3 / count
+    m3 = (r3
+          - np.einsum("...a,...bc->...abc", m, r2) - np.einsum("...b,...ac->...abc", m, r2)
+          - np.einsum("...c,...ab->...abc", m, r2)
+          + 2 * np.einsum("...a,...b,...c->...abc", m, m, m))
+    if s4 is None:
+        return m, m2, m3, None
+
+    r4 = s4 / count
+    m4 = (r4
+          - np.einsum("...a,...bcd->...abcd", m, r3) - np.einsum("...b,...acd->...abcd", m, r3)
+          - np.einsum("...c,...abd->...abcd", m, r3) - np.einsum("...d,...abc->...abcd", m, r3)
+          + np.einsum("...a,...b,...cd->...abcd", m, m, r2) + np.einsum("...a,...c,...bd->...abcd", m, m, r2)
+          + np.einsum("...a,...d,...bc->...abcd", m, m, r2) + np.einsum("...b,...c,...ad->...abcd", m, m, r2)
+          + np.einsum("...b,...d,...ac->...abcd", m, m, r2) + np.einsum("...c,...d,...ab->...abcd", m, m, r2)
+          - 3 * np.einsum("...a,...b,...c,...d->...abcd", m, m, m, m))
+
+    return m, m2, m3, m4
+
+
+def cylinder_moments(m2: npt.NDArray, m3: npt.NDArray, m4: npt.NDArray) -> \
+        tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
+    """Calculate the mu, f0, f1 and f2 matrices used by the cylinder fitting from central moments, possibly stacked"""
+    i, j = _TRIANGLE
+    mu = _TRIANGLE_WEIGHTS * m2[..., i, j]
+    f0 = m2
+    f1 = m3[..., :, i, j] * _TRIANGLE_WEIGHTS
+    f2 = (np.outer(_TRIANGLE_WEIGHTS, _TRIANGLE_WEIGHTS) * m4[..., i, j, :, :][..., i, j]
+          - np.einsum("...a,...b->...ab", mu, mu))
+
+    return mu, f0, f1, f2
+
+
+def monomials(points: npt.NDArray, order: int) -> npt.NDArray:
+    """Distinct products of the coordinates of each point of the first to the given order (columns)"""
+    columns = [points[:, list(indices)].prod(axis = 1) for indices in _monomial_indices(order)]
+    return np.column_stack(columns)
+
+
+def _monomial_indices(order: int) -> list[tuple[int, ...]]:
+    """Coordinate indices of the distinct products of the first to the given order"""
+    return [indices for k in range(1, order + 1) for indices in itertools.combinations_with_replacement(range(3), k)]
+
+
+def expand_power_sums(sums: npt.NDArray, order: int) -> list[npt.NDArray]:
+    """
+    Convert sums of the distinct products returned by monomials into the full symmetric power sums of the first to the
+    given order. Sums may be stacked along leading axes.
+    """
+    columns = {indices: column for column, indices in enumerate(_monomial_indices(order))}
+    tensors = []
+    for k in range(1, order + 1):
+        # Every element of the symmetric tensor takes the sum of the product with the same sorted indices
+        expand = [columns[tuple(sorted(indices))] for indices in itertools.product(range(3), repeat = k)]
+        tensors.append(sums[..., expand].reshape(sums.shape[:-1] + (3,) * k))
+    return tensors
+
+
+class Moments:
+    """
+    Running sums of the powers of a set of points allowing the points to be added and removed in constant time.
+    Sums are kept relative to the first added point to limit the loss of precision for points far from the origin.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.origin = np.zeros(3)
+        self.s1 = np.zeros(3)
+        self.s2 = np.zeros((3, 3))
+        self.s3 = np.zeros((3, 3, 3))
+        self.s4 = np.zeros((3, 3, 3, 3))
+
+    @classmethod
+    def from_points(cls, points: npt.ArrayLike) -> Moments:
+        """Create moments of the given points"""
+        moments = cls()
+        moments.add_points(points)
+        return moments
+
+    def copy(self) -> Moments:
+        """Return an independent copy of the moments"""
+        moments = Moments()
+        moments.count = self.count
+        moments.origin = self.origin.copy()
+        moments.s1 = self.s1.copy()
+        moments.s2 = self.s2.copy()
+        moments.s3 = self.s3.copy()
+        moments.s4 = self.s4.copy()
+        return moments
+
+    def clear(self) -> None:
+        """Remove all points"""
+        self.__init__()
+
+    def add(self, point: npt.ArrayLike) -> None:
+        """Add a single point"""
+        self.add_points(point)
+
+    def remove(self, point: npt.ArrayLike) -> None:
+        """Remove a single previously added point"""
+        self.remove_points(point)
+
+    def add_points(self, points: npt.ArrayLike) -> None:
+        """Add points to the sums"""
+        points = np.asarray(points, dtype = float).reshape(-1, 3)
+        if len(points) == 0:
+            return
+        if self.count == 0:
+            self.origin = points[0].copy()
+        self._update(points, 1)
+
+    def remove_points(self, points: npt.ArrayLike) -> None:
+        """Remove previously added points from the sums"""
+        points = np.asarray(points, dtype = float).reshape(-1, 3)
+        if len(points) > self.count:
+            raise ValueError("Cannot remove more points than were added")
+        self._update(points, -1)
+
+        # Start over from exact zeros so that rounding errors of the removed points don't accumulate
+        if self.count == 0:
+            self.clear()
+
+    def _update(self, points: npt.NDArray, sign: int) -> None:
+        """Add or subtract power sums of the points"""
+        s1, s2, s3, s4 = power_sums(points - self.origin)
+        self.count += sign * len(points)
+        self.s1 += sign * s1
+        self.s2 += sign * s2
+        self.s3 += sign * s3
+        self.s4 += sign * s4
+
+    @property
+    def mean(self) -> npt.NDArray:
+        """Centroid of the points"""
+        return self.origin + self.s1 / self.count
+
+    @property
+    def scatter(self) -> npt.NDArray:
+        """Covariance matrix of the points"""
+        m = self.s1 / self.count
+        return self.s2 / self.count - np.outer(m, m)
+
+    def central_moments(self) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
+        """Return the mean and the second to fourth central moments of the points"""
+        m, m2, m3, m4 = central_moments(self.count, self.s1, self.s2, self.s3, self.s4)
+        return self.origin + m, m2, m3, m4
+
+    def cylinder_moments(self) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
+        """Return the mu, f0, f1 and f2 matrices used by the cylinder fitting"""
+        _, m2, m3, m4 = self.central_moments()
+        return cylinder_moments(m2, m3, m4)
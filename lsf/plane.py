@@ -1,48 +1,55 @@
+from __future__ import annotations
+
 import numpy as np
 import numpy.typing as npt
 import logging
 
+from lsf.pointset import PointSet
+from lsf import cache, residuals
 from config import lang
 
 
 logger = logging.getLogger("LSF")
 
 
-def plane_normal(centered_points: npt.ArrayLike) -> npt.NDArray:
-    """Calculate normal vector of plane fitted through points centered around the origin"""
-    # Singular Value Decomposition
-    # Plane normal is the left singular vector with corresponding to the least singular value
-    svd = np.linalg.svd(centered_points.T)
-    left = svd[0]
-    normal_vector = left[:, -1]
-
-    return normal_vector
-
-
 def plane_coordinate_system(normal_vector: npt.ArrayLike) -> npt.NDArray:
-    """Create a coordinate system local to a plane"""
-    # Construct a coordinate system oriented to the plane
-    helper_vector = [1, 0, 0] if normal_vector[0] < normal_vector[2] else [0, 0, 1]
+    """Create an orthonormal coordinate system local to a plane, normals may be stacked along leading axes"""
+    # Construct a coordinate system oriented to the plane, helper vector must not be parallel to the normal
+    normal_vector = np.asarray(normal_vector)
+    use_x = np.abs(normal_vector[..., :1]) < np.abs(normal_vector[..., 2:])
+    helper_vector = np.where(use_x, [1, 0, 0], [0, 0, 1])
     y_axis = np.cross(normal_vector, helper_vector)
+    y_axis /= np.linalg.norm(y_axis, axis = -1, keepdims = True)
     x_axis = np.cross(y_axis, normal_vector)
-    plane_cs = np.vstack((x_axis, y_axis, normal_vector))
+    plane_cs = np.stack((x_axis, y_axis, normal_vector), axis = -2)
 
     return plane_cs
 
 
-def fit_plane(points: npt.ArrayLike) -> npt.NDArray:
-    """Calculate best fit plane from the points and return bounding rectangle in the fitted plane"""
+def rectangle_normal(rectangle: npt.ArrayLike) -> npt.NDArray:
+    """Unit normal vector of a plane represented by its bounding rectangle"""
+    rectangle = np.asarray(rectangle)
+    normal_vector = np.cross(rectangle[1] - rectangle[0], rectangle[2] - rectangle[0])
+    return normal_vector / np.linalg.norm(normal_vector)
+
+
+@cache.memoize("plane")
+def fit_plane(points: npt.ArrayLike | PointSet, report: bool = False) -> \
+        npt.NDArray | tuple[npt.NDArray, residuals.FitReport]:
+    """
+    Calculate best fit plane from the points and return bounding rectangle in the fitted plane.
+    When report is requested return also the quality of the fit.
+    """
     logger.info(lang.info.plane_fitting)
 
-    # Center the points around origin
-    average = np.mean(points, axis = 0)
-    centered_points = points - average
+    point_set = PointSet.of(points)
 
-    normal_vector = plane_normal(centered_points)
+    # Plane normal is the eigenvector corresponding to the least eigenvalue of the scatter matrix
+    normal_vector = point_set.principal_axes[1][:, 0]
     plane_cs = plane_coordinate_system(normal_vector)
 
     # Transform centered points to the plane coordinate systems and find their bounding rectangle
-    plane_points = plane_cs @ centered_points.T
+    plane_points = plane_cs @ point_set.centered.T
     x0, y0, _ = np.min(plane_points, axis = 1)
     x1, y1, _ = np.max(plane_points, axis = 1)
     bounding_rect = np.array([
@@ -52,9 +59,13 @@ def fit_plane(points: npt.ArrayLike) -> npt.NDArray:
         [x1, y1, 0]
     ])
 
-    # Transform bounding rectangle back to the global CS
-    plane_cs_inv = np.linalg.inv(plane_cs)
-    global_bounding_rect = (plane_cs_inv @ bounding_rect.T).T
-    global_bounding_rect += average
+    # Transform bounding rectangle back to the global CS, coordinate system is orthonormal so its inverse is transpose
+    global_bounding_rect = (plane_cs.T @ bounding_rect.T).T
+    global_bounding_rect += point_set.mean
 
+    if report:
+        # Mean squared distance from the plane is the least eigenvalue of the scatter matrix
+        distances = plane_points[2]
+        return global_bounding_rect, residuals.fit_report(distances, point_set.principal_axes[0][0],
+                                                                   point_set.reduction)
     return global_bounding_rect
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from functools import cached_property
+import hashlib
+import numpy as np
+import numpy.typing as npt
+
+from lsf import moments as mom
+from lsf.reduction import Reduction, reduce_points, voxel_sample
+
+# Random preselection for subsampling is seeded so that repeated fits of the same points give the same result
+_SUBSAMPLE_SEED = 0
+# Number of randomly preselected points per point of the subsample
+_SUBSAMPLE_CANDIDATES = 4
+
+
+class PointSet:
+    """
+    Set of points with lazily calculated properties shared by all fits of the same points.
+    Each property is calculated at most once. When running moments of the points are given, properties that can be
+    derived from them are calculated without going through the points.
+    """
+
+    def __init__(self, points: npt.ArrayLike, moments: mom.Moments | None = None) -> None:
+        self.points = np.asarray(points, dtype = float).reshape(-1, 3)
+        self.moments = moments
+        self.reduction: Reduction | None = None
+        self._subsamples: dict[int, PointSet] = {}
+
+    @classmethod
+    def of(cls, points: npt.ArrayLike | PointSet) -> PointSet:
+        """Return the given point set or wrap points in a new one"""
+        if isinstance(points, PointSet):
+            return points
+        return cls(points)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def reduced(self, tolerance: float, target_count: int = 0) -> PointSet:
+        """
+        Return point set with coincident points merged and, when target_count is positive, decimated to about
+        target_count points. The returned point set records the changes in its reduction attribute.
+        """
+        points, inverse, reduction = reduce_points(self.points, tolerance, target_count)
+
+        # Keep the exact points and their moments when nothing changed
+        if reduction.count == len(self):
+            point_set = PointSet(self.points, self.moments)
+        # Merging replaces only a few points, their moments are updated instead of going through all points again
+        elif self.moments is not None and reduction.voxel_size == 0:
+            point_set = PointSet(points, self.merged_moments(points, inverse))
+        else:
+            point_set = PointSet(points)
+        point_set.reduction = reduction
+        return point_set
+
+    def merged_moments(self, merged: npt.NDArray, inverse: npt.NDArray) -> mom.Moments:
+        """Return running moments of the merged points, inverse gives the merged point replacing each point"""
+        sizes = np.bincount(inverse, minlength = len(merged))
+        moments = self.moments.copy()
+        moments.remove_points(self.points[sizes[inverse] > 1])
+        moments.add_points(merged[sizes > 1])
+        return moments
+
+    def subsample(self, count: int) -> PointSet:
+        """Return point set of about count points evenly spread over the space occupied by the points"""
+        if count in self._subsamples:
+            return self._subsamples[count]
+
+        # Spread the points by voxels over a random preselection to keep the cost independent of the number of points
+        rng = np.random.default_rng(_SUBSAMPLE_SEED)
+        candidates = self.points
+        if len(candidates) > _SUBSAMPLE_CANDIDATES * count:
+            candidates = candidates[rng.choice(len(candidates), _SUBSAMPLE_CANDIDATES * count, replace = False)]
+        self._subsamples[count] = PointSet(candidates[voxel_sample(candidates, count)])
+        return self._subsamples[count]
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Hash of the coordinates identifying the points"""
+        # SHA-256 is hardware accelerated on most processors, the array is hashed without copying it
+        digest = hashlib.sha256(np.ascontiguousarray(self.points))
+        digest.update(repr(self.points.shape).encode())
+        return digest.hexdigest()
+
+    @cached_property
+    def mean(self) -> npt.NDArray:
+        """Centroid of the points"""
+        if self.moments is not None:
+            return self.moments.mean
+        return mom.chunked_power_sums(self.points, 1)[0] / len(self)
+
+    @cached_property
+    def centered(self) -> npt.NDArray:
+        """Points centered around the origin"""
+        return self.points - self.mean
+
+    @cached_property
+    def scatter(self) -> npt.NDArray:
+        """Covariance matrix of the points"""
+        if self.moments is not None:
+            return self.moments.scatter
+        # Second central moment is the scatter matrix, reuse it when the higher moments are already known
+        if "central_moments" in self.__dict__:
+            return self.central_moments[0]
+        return mom.chunked_power_sums(self.points, 2, self.mean)[1] / len(self)
+
+    @cached_property
+    def principal_axes(self) -> tuple[npt.NDArray, npt.NDArray]:
+        """Eigenvalues in ascending order and corresponding eigenvectors (columns) of the scatter matrix"""
+        return np.linalg.eigh(self.scatter)
+
+    @cached_property
+    def bounds(self) -> tuple[npt.NDArray, npt.NDArray]:
+        """Minimal and maximal coordinates of the points"""
+        return np.min(self.points, axis = 0), np.max(self.points, axis = 0)
+
+    @cached_property
+    def central_moments(self) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+        """Second to fourth central moments of the points"""
+        if self.moments is not None:
+            _, m2, m3, m4 = self.moments.central_moments()
+        else:
+            _, m2, m3, m4 = mom.central_moments(len(self), *mom.chunked_power_sums(self.points, 4, self.mean))
+        return m2, m3, m4
+
+    @cached_property
+    def cylinder_moments(self) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
+        """The mu, f0, f1 and f2 matrices used by the cylinder fitting"""
+        return mom.cylinder_moments(*self.central_moments)
+
+    def extent_along(self, direction: npt.ArrayLike) -> tuple[float, float]:
+        """Minimal and maximal distance of the points from the centroid measured along a direction"""
+        distances = self.points @ direction - self.mean @ direction
+        return float(np.min(distances)), float(np.max(distances))
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+from typing import NamedTuple
+
+# Large primes used to hash integer cell coordinates into a single key
+_HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype = np.uint64)
+# Maximal number of voxel sizes tried when searching for the size giving the target number of points
+_VOXEL_ITERATIONS = 8
+# Relative difference from the target number of points at which the voxel size search stops
+_VOXEL_COUNT_TOLERANCE = 0.05
+
+
+class Reduction(NamedTuple):
+    """Summary of the changes made to a point set before fitting"""
+    original_count: int
+    merged_count: int  # Number of points after merging coincident points
+    count: int  # Number of points after voxel decimation
+    voxel_size: float  # 0 when the points weren't decimated
+    max_shift: float  # Largest distance between an original point and the point replacing it
+
+
+def group_cells(cells: npt.NDArray) -> tuple[npt.NDArray, int]:
+    """Assign the same group index to points in the same grid cell. Return group index of each point and group count"""
+    # Sort cells by their spatial hash, cells are compared as well so a hash collision can't merge different cells
+    keys = cells.astype(np.uint64) @ _HASH_PRIMES
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    sorted_cells = cells[order]
+
+    new_group = np.empty(len(cells), dtype = bool)
+    new_group[:1] = True
+    new_group[1:] = (sorted_keys[1:] != sorted_keys[:-1]) | np.any(sorted_cells[1:] != sorted_cells[:-1], axis = 1)
+    group_ids = np.cumsum(new_group) - 1
+
+    inverse = np.empty(len(cells), dtype = np.int64)
+    inverse[order] = group_ids
+    return inverse, int(group_ids[-1]) + 1 if len(cells) else 0
+
+
+def group_centroids(points: npt.NDArray, inverse: npt.NDArray, count: int) -> npt.NDArray:
+    """Calculate centroid of each group of points"""
+    sizes = np.bincount(inverse, minlength = count)
+    centroids = np.empty((count, 3))
+    for i in range(3):
+        centroids[:, i] = np.bincount(inverse, weights = points[:, i], minlength = count)
+    return centroids / sizes[:, None]
+
+
+def merge_coincident(points: npt.ArrayLike, tolerance: float) -> tuple[npt.NDArray, npt.NDArray]:
+    """
+    Replace points lying in the same cell of a grid with the given spacing by their centroid.
+    Grid is applied twice, the second time shifted by half a cell, to merge close points split by a cell boundary.
+    Return merged points and index of the merged point for every original point.
+    """
+    points = np.asarray(points, dtype = float)
+    inverse = np.arange(len(points))
+    for offset in (0.0, 0.5):
+        cells = np.floor(points / tolerance + offset).astype(np.int64)
+        cell_inverse, count = group_cells(cells)
+        points = group_centroids(points, cell_inverse, count)
+        inverse = cell_inverse[inverse]
+    return points, inverse
+
+
+def voxel_grid(points: npt.NDArray, target_count: int) -> tuple[npt.NDArray, int, float]:
+    """
+    Group points by voxels of a grid with voxel size chosen so that about target_count voxels are occupied.
+    Return voxel index of each point, number of occupied voxels and the voxel size.
+    """
+    min_coords = np.min(points, axis = 0)
+    extent = float(np.linalg.norm(np.max(points, axis = 0) - min_coords))
+    # All points coincide, they occupy a single voxel of any size
+    if extent == 0:
+        return np.zeros(len(points), dtype = np.int64), 1, 0.0
+
+    # Number of occupied voxels is proportional to size^-dimension, start by assuming the points form a surface
+    dimension = 2.0
+    size = extent / np.sqrt(target_count)
+    best = None
+    previous = None
+    for _ in range(_VOXEL_ITERATIONS):
+        inverse, count = group_cells(np.floor((points - min_coords) / size).astype(np.int64))
+        if best is None or abs(count - target_count) < abs(best[1] - target_count):
+            best = inverse, count, size
+        if abs(count - target_count) <= _VOXEL_COUNT_TOLERANCE * target_count:
+            break
+
+        # Estimate dimension of the point set from the last two voxel sizes
+        if previous is not None and previous[1] != count and previous[0] != size:
+            dimension = float(np.clip(-np.log(previous[1] / count) / np.log(previous[0] / size), 1, 3))
+        previous = size, count
+        size *= (count / target_count) ** (1 / dimension)
+
+    return best
+
+
+def voxel_decimate(points: npt.ArrayLike, target_count: int) -> tuple[npt.NDArray, npt.NDArray, float]:
+    """
+    Replace points in each voxel of a grid by their centroid with voxel size chosen to keep about target_count points.
+    Return decimated points, index of the decimated point for every original point and the voxel size.
+    """
+    points = np.asarray(points, dtype = float)
+    inverse, count, size = voxel_grid(points, target_count)
+    return group_centroids(points, inverse, count), inverse, size
+
+
+def voxel_sample(points: npt.ArrayLike, target_count: int) -> npt.NDArray:
+    """Return indices of about target_count points spread evenly in space, one point from each voxel of a grid"""
+    points = np.asarray(points, dtype = float)
+    if len(points) <= target_count:
+        return np.arange(len(points))
+
+    inverse, _, _ = voxel_grid(points, target_count)
+    _, indices = np.unique(inverse, return_index = True)
+    return indices
+
+
+def reduce_points(points: npt.ArrayLike, tolerance: float,
+                  target_count: int = 0) -> tuple[npt.NDArray, npt.NDArray, Reduction]:
+    """
+    Merge coincident points and, when target_count is positive, decimate them to about target_count points.
+    Return reduced points, index of the reduced point for every original point and summary of the changes.
+    """
+    points = np.asarray(points, dtype = float).reshape(-1, 3)
+    if len(points) == 0:
+        return points, np.empty(0, dtype = np.int64), Reduction(0, 0, 0, 0.0, 0.0)
+
+    reduced, inverse = merge_coincident(points, tolerance)
+    merged_count = len(reduced)
+
+    voxel_size = 0.0
+    if 0 < target_count < merged_count:
+        reduced, voxel_inverse, voxel_size = voxel_decimate(reduced, target_count)
+        inverse = voxel_inverse[inverse]
+
+    shifts = points - reduced[inverse]
+    max_shift = float(np.sqrt(np.max(np.einsum("ij,ij->i", shifts, shifts))))
+
+    return reduced, inverse, Reduction(len(points), merged_count, len(reduced), float(voxel_size), max_shift)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+from typing import NamedTuple
+
+from lsf.reduction import Reduction
+from config import config
+
+
+class FitReport(NamedTuple):
+    """Quality of a fitted object"""
+    distances: npt.NDArray  # Signed distances of the points from the object
+    rms: float
+    max_deviation: float
+    percentiles: dict[float, float]  # Percentiles of the signed distances
+    objective: float  # Value minimized by the fitting function
+    reduction: Reduction | None = None  # Changes made to the points before fitting
+
+
+def fit_report(distances: npt.NDArray, objective: float, reduction: Reduction | None = None) -> FitReport:
+    """Summarize distances of the points from a fitted object"""
+    levels = config.quality.percentiles
+    rms = float(np.sqrt(np.dot(distances, distances) / len(distances)))
+    max_deviation = float(max(-np.min(distances), np.max(distances)))
+    percentiles = dict(zip(levels, np.percentile(distances, levels).tolist()))
+
+    return FitReport(distances, rms, max_deviation, percentiles, float(objective), reduction)
+
+
+def _norms(vectors: npt.NDArray) -> npt.NDArray:
+    """Lengths of row vectors"""
+    return np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+
+
+def line_distances(points: npt.ArrayLike, start_point: npt.ArrayLike, end_point: npt.ArrayLike) -> npt.NDArray:
+    """Distances of the points from an infinite line going through two points"""
+    direction = np.asarray(end_point) - start_point
+    direction = direction / np.linalg.norm(direction)
+
+    x = np.asarray(points) - start_point
+    return _norms(x - np.outer(x @ direction, direction))
+
+
+def circle_distances(points: npt.ArrayLike, normal: npt.ArrayLike, center: npt.ArrayLike, r: float) -> npt.NDArray:
+    """Distances of the points from a circle in 3D, negative for points closer to the circle axis than its radius"""
+    x = np.asarray(points) - center
+    height = x @ normal
+    radial = _norms(x - np.outer(height, normal))
+
+    radial_error = radial - r
+    return np.copysign(np.hypot(height, radial_error), radial_error)
+
+
+def cylinder_distances(points: npt.ArrayLike, direction: npt.ArrayLike, radius: float, origin: npt.ArrayLike) -> \
+        npt.NDArray:
+    """Signed distances of the points from an infinite cylinder surface, negative inside the cylinder"""
+    x = np.asarray(points) - origin
+    radial = _norms(x - np.outer(x @ direction, direction))
+    return radial - radius
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from lsf.pointset import PointSet
+
+
+def grid_evaluations(ratio: int) -> int:
+    """Number of axes evaluated by a search step refining the previous step by the given ratio"""
+    # Each step searches +-previous step around the best axis, giving 2 * ratio + 1 angles in each direction
+    return (2 * ratio + 1) ** 2
+
+
+def tuned_angle_steps(first_step: float, accuracy: float, min_ratio: int = 2, max_ratio: int = 10) -> list[float]:
+    """
+    Return angle steps (in degrees) starting with first_step and reaching the accuracy (in degrees) with the least
+    number of evaluated axes. Each step is the previous one divided by the same integer ratio.
+    """
+    if min_ratio > max_ratio:
+        raise ValueError(f"Smallest ratio {min_ratio} of angle steps is larger than the largest ratio {max_ratio}")
+    if accuracy >= first_step:
+        return [first_step]
+
+    # Ratio r needs log(first_step / accuracy) / log(r) levels, each evaluating (2r + 1)^2 axes
+    span = np.log(first_step / accuracy)
+    best_ratio, best_levels = max_ratio, 0
+    best_cost = np.inf
+    for ratio in range(max(min_ratio, 2), max_ratio + 1):
+        levels = int(np.ceil(span / np.log(ratio) - 1e-9))
+        cost = levels * grid_evaluations(ratio)
+        if cost < best_cost:
+            best_ratio, best_levels, best_cost = ratio, levels, cost
+
+    return [first_step / best_ratio ** level for level in range(best_levels + 1)]
+
+
+def noise_estimate(error: float, r_sqr: float, num_points: int) -> float:
+    """
+    Estimate standard deviation of the distances of the points from a fitted cylinder from its error.
+    The error is the mean of (d^2 - r^2)^2 over the points divided by their number, and the mean is about
+    4 r^2 sigma^2 for small deviations.
+    """
+    return float(np.sqrt(max(error, 0) * num_points / (4 * r_sqr))) if r_sqr > 0 else 0.0
+
+
+def error_noise_floor(error: float, num_points: int) -> float:
+    """Change of the cylinder error too small to be told apart from the noise, about a single point's share of it"""
+    return error / num_points
+
+
+def axis_accuracy(point_set: PointSet, error: float, r_sqr: float, axis: npt.NDArray) -> float:
+    """
+    Standard error (in degrees) of the cylinder axis direction supported by the noise of the points.
+    Tilting the axis moves the points by the tilt times their distance along the axis from the centroid.
+    """
+    spread = np.sqrt(max(float(axis @ point_set.scatter @ axis), 0))
+    if spread == 0:
+        return 0.0
+    return float(np.degrees(noise_estimate(error, r_sqr, len(point_set)) / (spread * np.sqrt(len(point_set)))))
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import itertools
+import numpy as np
+import numpy.typing as npt
+from typing import NamedTuple
+import logging
+
+from lsf import moments as mom
+from lsf import axis_estimate, circle, cylinder, plane
+from lsf.pointset import PointSet
+from lsf.reduction import group_cells, group_centroids
+from lsf.requirements import required_points
+from config import config, lang
+
+logger = logging.getLogger("LSF")
+
+# Offsets of half of the 26 neighbouring grid cells, the other half is reached from the neighbours
+_NEIGHBOURS = np.array([offset for offset in itertools.product((-1, 0, 1), repeat = 3) if offset > (0, 0, 0)])
+
+
+class Segment(NamedTuple):
+    """Object fitted to a connected group of points"""
+    fitting_object: str
+    indices: npt.NDArray  # Indices of the points of the group
+    fitting_data: tuple | npt.NDArray  # Object as returned by its fitting function
+    rms: float  # Root mean square distance of the points from the object estimated from their moments
+
+
+def connected_components(count: int, first: npt.NDArray, second: npt.NDArray) -> tuple[npt.NDArray, int]:
+    """Label connected components of a graph given by its edges. Return component of each node and component count"""
+    # Every node points to the lowest node known to be connected to it, edges hook the larger of their two labels onto
+    # the smaller one and the pointers are followed to the end until no edge joins two labels
+    labels = np.arange(count)
+    while True:
+        hooked = labels.copy()
+        np.minimum.at(hooked, np.maximum(labels[first], labels[second]), np.minimum(labels[first], labels[second]))
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+
+        if np.array_equal(hooked, labels):
+            break
+        labels = hooked
+
+    roots, labels = np.unique(labels, return_inverse = True)
+    return labels, len(roots)
+
+
+def connected_groups(points: npt.NDArray, spacing: float) -> tuple[npt.NDArray, int]:
+    """
+    Split points into groups connected by chains of points closer than spacing, points may join a group up to about
+    3.5 spacings away. Points are hashed into a grid of cells of the spacing size and groups grow over the occupied
+    neighbouring cells. Return group index of each point and number of groups, larger groups have lower indices.
+    """
+    cells = np.floor((points - np.min(points, axis = 0)) / spacing).astype(np.int64)
+    cell_inverse, cell_count = group_cells(cells)
+    cell_coords = np.empty((cell_count, 3), dtype = np.int64)
+    cell_coords[cell_inverse] = cells
+
+    # Number the cells of the bounding grid, padded by a cell on each side so that no neighbour wraps around
+    shape = tuple(np.max(cell_coords, axis = 0) + 3)
+    keys = np.ravel_multi_index((cell_coords + 1).T, shape)
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+
+    first, second = [], []
+    for offset in _NEIGHBOURS:
+        neighbour_keys = np.ravel_multi_index((cell_coords + 1 + offset).T, shape)
+        positions = np.minimum(np.searchsorted(sorted_keys, neighbour_keys), cell_count - 1)
+        found = sorted_keys[positions] == neighbour_keys
+        first.append(np.flatnonzero(found))
+        second.append(order[positions[found]])
+
+    cell_groups, count = connected_components(cell_count, np.concatenate(first), np.concatenate(second))
+
+    # Order groups by their size
+    groups = cell_groups[cell_inverse]
+    ranks = np.empty(count, dtype = np.int64)
+    ranks[np.argsort(-np.bincount(groups, minlength = count), kind = "stable")] = np.arange(count)
+    return ranks[groups], count
+
+
+def group_moments(centered_points: npt.NDArray, groups: npt.NDArray, count: int, order: int) -> \
+        tuple[npt.NDArray, npt.NDArray | None, npt.NDArray | None]:
+    """Second to given order central moments of each group of points centered around the centroids of their groups"""
+    features = mom.monomials(centered_points, order)
+    sums = np.column_stack([np.bincount(groups, weights = column, minlength = count) for column in features.T])
+    sizes = np.bincount(groups, minlength = count)
+
+    # Power sums divided by the size of the group are moments of a single point
+    _, m2, m3, m4 = mom.central_moments(1, *mom.expand_power_sums(sums / sizes[:, None], order))
+    return m2, m3, m4
+
+
+def group_extremes(values: npt.NDArray, groups: npt.NDArray, count: int) -> tuple[npt.NDArray, npt.NDArray]:
+    """Minimal and maximal values (rows) in each group"""
+    minima = np.full((count,) + values.shape[1:], np.inf)
+    maxima = np.full((count,) + values.shape[1:], -np.inf)
+    np.minimum.at(minima, groups, values)
+    np.maximum.at(maxima, groups, values)
+    return minima, maxima
+
+
+def fit_planes(centered: npt.NDArray, groups: npt.NDArray, centroids: npt.NDArray, normals: npt.NDArray) -> \
+        npt.NDArray:
+    """Bounding rectangles of the planes with the given normals fitted to the groups, as fit_plane returns them"""
+    plane_cs = plane.plane_coordinate_system(normals)
+    plane_points = np.einsum("nij,nj->ni", plane_cs[groups], centered)
+    (x0, y0, _), (x1, y1, _) = (item.T for item in group_extremes(plane_points, groups, len(normals)))
+
+    zeros = np.zeros(len(normals))
+    bounding_rects = np.stack([
+        np.column_stack((x0, y0, zeros)),
+        np.column_stack((x1, y0, zeros)),
+        np.column_stack((x0, y1, zeros)),
+        np.column_stack((x1, y1, zeros))
+    ], axis = 1)
+    return np.einsum("gji,gkj->gki", plane_cs, bounding_rects) + centroids[:, None]
+
+
+def fit_lines(points: npt.NDArray, groups: npt.NDArray, centroids: npt.NDArray, directions: npt.NDArray) -> \
+        tuple[npt.NDArray, npt.NDArray]:
+    """Start and end points of the lines with the given directions fitted to the groups, as fit_line returns them"""
+    min_coords, max_coords = group_extremes(points, groups, len(directions))
+    half_lengths = np.linalg.norm(max_coords - min_coords, axis = 1)[:, None] / 2
+    return centroids - directions * half_lengths, centroids + directions * half_lengths
+
+
+def fit_circles(m2: npt.NDArray, m3: npt.NDArray, m4: npt.NDArray, normals: npt.NDArray) -> \
+        tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """
+    Center (relative to the centroid), radius and mean squared distance in the plane of the circles fitted to the groups
+    with the given moments and plane normals
+    """
+    plane_cs = plane.plane_coordinate_system(normals)
+    c, b = circle.solve_circle(plane_cs, m2, m3)
+    centers, radii = circle.circle_parameters(plane_cs, c)
+
+    # Algebraic residual of a point at distance d from the circle is about 2 r d
+    plane_m4 = np.einsum("...ai,...bj,...ck,...dl,...ijkl->...abcd", plane_cs, plane_cs, plane_cs, plane_cs, m4,
+                         optimize = True)
+    b_sqr = plane_m4[:, 0, 0, 0, 0] + 2 * plane_m4[:, 0, 0, 1, 1] + plane_m4[:, 1, 1, 1, 1]
+    objective = b_sqr - np.einsum("gi,gi->g", c, b)
+    return centers, radii, np.maximum(objective, 0) / np.maximum(4 * radii ** 2, np.finfo(float).tiny)
+
+
+def fit_cylinders(point_sets: list[PointSet], m2: npt.NDArray, m3: npt.NDArray, m4: npt.NDArray) -> \
+        tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
+    """
+    Axis, squared radius, center (relative to the centroid) and mean squared distance of the cylinders fitted to the
+    groups with the given moments. Axes of all groups are searched at once around axes estimated from the points,
+    groups without a reliable estimate start around the best axis among all directions at the first angle step.
+    """
+    first_step = np.radians(config.cylinder_angle_steps[0])
+    accuracy = np.radians(config.angle_schedule.target_accuracy)
+    sizes = np.array([len(point_set) for point_set in point_sets])
+    mu, f0, f1, f2 = mom.cylinder_moments(m2, m3, m4)
+
+    estimates = [axis_estimate.estimate_axis(point_set, first_step) for point_set in point_sets]
+    scanned = np.array([estimate is None for estimate in estimates], dtype = bool)
+    initial_axes = np.empty((len(point_sets), 3))
+    cones = np.full(len(point_sets), first_step)
+    for i, estimate in enumerate(estimates):
+        if estimate is not None:
+            initial_axes[i], cones[i] = estimate
+    if np.any(scanned):
+        initial_axes[scanned] = cylinder.scan_axes(sizes[scanned], mu[scanned], f0[scanned], f1[scanned],
+                                                   f2[scanned], first_step)
+
+    rotations = np.array([cylinder.axis_rotation(axis) for axis in initial_axes])
+    axes, r_sqr, centers, errors = cylinder.search_axes(rotations, np.maximum(cones, 2 * accuracy), sizes, mu, f0, f1,
+                                                        f2, accuracy)
+
+    # Error is the mean of (d^2 - r^2)^2 over the points divided by their number, about 4 r^2 sigma^2 / N
+    distances_sqr = np.maximum(errors, 0) * sizes / np.maximum(4 * r_sqr, np.finfo(float).tiny)
+    return axes, r_sqr, centers, distances_sqr
+
+
+def segment_points(points: npt.ArrayLike | PointSet, spacing: float | None = None,
+                   tolerance: float | None = None) -> list[Segment]:
+    """
+    Split points into connected groups and fit each group with the simplest object fitting it within the tolerance.
+    Groups are lines when their points lie on a line, circles or planes when they lie in a plane and cylinders
+    otherwise. All groups are classified and fitted at once from their moments.
+    By default the spacing of the groups and the tolerance are taken from the segmentation settings.
+    """
+    logger.info(lang.info.segmentation)
+
+    point_set = PointSet.of(points)
+    spacing = config.segmentation.spacing if spacing is None else spacing
+    tolerance = config.segmentation.tolerance if tolerance is None else tolerance
+    if len(point_set) == 0:
+        return []
+
+    groups, count = connected_groups(point_set.points, spacing)
+    sizes = np.bincount(groups, minlength = count)
+    order = np.argsort(groups, kind = "stable")
+    bounds = np.concatenate(([0], np.cumsum(sizes)))
+    centroids = group_centroids(point_set.points, groups, count)
+    centered = point_set.points - centroids[groups]
+    m2, m3, m4 = group_moments(centered, groups, count, 4)
+    eigenvalues, eigenvectors = np.linalg.eigh(m2)
+
+    # Classify by the mean squared distances from the best line and plane, planar groups may be circles
+    kinds = np.full(count, "", dtype = object)
+    large = sizes >= config.segmentation.min_points
+    is_line = large & (eigenvalues[:, 0] + eigenvalues[:, 1] <= tolerance ** 2) & (sizes >= required_points["line"])
+    is_planar = large & ~is_line & (eigenvalues[:, 0] <= tolerance ** 2) & (sizes >= required_points["plane"])
+    kinds[is_line] = "line"
+    kinds[is_planar] = "plane"
+
+    circle_centers, radii, circle_distances_sqr = fit_circles(m2[is_planar], m3[is_planar], m4[is_planar],
+                                                              eigenvectors[is_planar, :, 0])
+    is_circle = np.zeros(count, dtype = bool)
+    is_circle[is_planar] = eigenvalues[is_planar, 0] + circle_distances_sqr <= tolerance ** 2
+    kinds[is_circle] = "circle"
+
+    is_cylinder = large & ~is_line & ~is_planar & (sizes >= required_points["cylinder"])
+    kinds[is_cylinder] = "cylinder"
+    skipped = int(np.sum(kinds == ""))
+    if skipped:
+        logger.debug(f"{skipped} groups have too few points to be fitted")
+
+    # Fit all groups of each kind at once
+    fitting_data = np.empty(count, dtype = object)
+    distances_sqr = np.zeros(count)
+
+    plane_groups = np.flatnonzero(is_planar & ~is_circle)
+    in_planes = np.isin(groups, plane_groups)
+    rectangles = fit_planes(centered[in_planes], np.searchsorted(plane_groups, groups[in_planes]),
+                            centroids[plane_groups], eigenvectors[plane_groups, :, 0])
+    for group, rectangle in zip(plane_groups, rectangles):
+        fitting_data[group] = rectangle
+    distances_sqr[plane_groups] = eigenvalues[plane_groups, 0]
+
+    line_groups = np.flatnonzero(is_line)
+    in_lines = np.isin(groups, line_groups)
+    starts, ends = fit_lines(point_set.points[in_lines], np.searchsorted(line_groups, groups[in_lines]),
+                             centroids[line_groups], eigenvectors[line_groups, :, 2])
+    for group, start_point, end_point in zip(line_groups, starts, ends):
+        fitting_data[group] = (start_point, end_point)
+    distances_sqr[line_groups] = eigenvalues[line_groups, 0] + eigenvalues[line_groups, 1]
+
+    circle_groups = np.flatnonzero(is_circle)
+    in_circles = is_circle[np.flatnonzero(is_planar)]
+    for group, center, radius in zip(circle_groups, circle_centers[in_circles], radii[in_circles]):
+        fitting_data[group] = (eigenvectors[group, :, 0], center + centroids[group], float(radius))
+    distances_sqr[circle_groups] = eigenvalues[circle_groups, 0] + circle_distances_sqr[in_circles]
+
+    cylinder_groups = np.flatnonzero(is_cylinder)
+    if len(cylinder_groups):
+        point_sets = [PointSet(point_set.points[order[bounds[group]:bounds[group + 1]]]) for group in cylinder_groups]
+        axes, r_sqr, centers, distances_sqr[cylinder_groups] = fit_cylinders(
+            point_sets, m2[cylinder_groups], m3[cylinder_groups], m4[cylinder_groups])
+
+        # Cylinders span the extent of their points along the axis as fit_cylinder returns them
+        in_cylinders = np.isin(groups, cylinder_groups)
+        positions = np.searchsorted(cylinder_groups, groups[in_cylinders])
+        heights = np.einsum("ij,ij->i", centered[in_cylinders], axes[positions])
+        min_heights, max_heights = group_extremes(heights, positions, len(cylinder_groups))
+        for i, group in enumerate(cylinder_groups):
+            end_point = centroids[group] + centers[i] + axes[i] * min_heights[i]
+            length = float(max_heights[i] - min_heights[i])
+            fitting_data[group] = (axes[i], float(np.sqrt(r_sqr[i])), end_point, length)
+
+    return [Segment(kinds[group], order[bounds[group]:bounds[group + 1]], fitting_data[group],
+                    float(np.sqrt(max(distances_sqr[group], 0)))) for group in range(count) if kinds[group]]
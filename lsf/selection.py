@@ -0,0 +1,72 @@
+"""
+Files holding selected vertices so that a selection can be restored later or fitted without Solid Edge.
+The file starts with a header followed by the name of the document the vertices belong to (UTF-8), the vertex tags
+as little-endian int64 and their coordinates as little-endian float64.
+Header: magic b"LSFS", format version, reserved (0), length of the document name in bytes, number of vertices.
+"""
+from __future__ import annotations
+
+import struct
+from typing import NamedTuple
+import numpy as np
+import numpy.typing as npt
+
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIQ")
+_MAGIC = b"LSFS"
+_TAG_DTYPE = np.dtype("<i8")
+_POINT_DTYPE = np.dtype("<f8")
+
+
+class SelectionFileError(Exception):
+    """Exception when a selection file is malformed or of an unknown version"""
+
+
+class Selection(NamedTuple):
+    document: str  # Full name of the document the vertices were selected in
+    tags: npt.NDArray  # Tags of the vertices
+    points: npt.NDArray  # Coordinates of the vertices, one row per vertex
+
+
+def save_selection(file: str, document: str, tags: npt.ArrayLike, points: npt.ArrayLike) -> None:
+    """Save tags and coordinates of selected vertices of the document"""
+    tags = np.ascontiguousarray(tags, dtype = _TAG_DTYPE).reshape(-1)
+    points = np.ascontiguousarray(points, dtype = _POINT_DTYPE).reshape(-1, 3)
+    if len(tags) != len(points):
+        raise ValueError("Every vertex has to have both tag and coordinates")
+
+    name = document.encode()
+    with open(file, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, VERSION, 0, len(name), len(points)) + name)
+        f.write(memoryview(tags).cast("B"))
+        f.write(memoryview(points).cast("B"))
+
+
+def load_selection(file: str) -> Selection:
+    """Load selected vertices saved by save_selection"""
+    with open(file, "rb") as f:
+        data = bytearray(f.read())
+
+    if len(data) < _HEADER.size:
+        raise SelectionFileError(f"{file} isn't a selection file")
+    magic, version, _, name_length, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise SelectionFileError(f"{file} isn't a selection file")
+    if version != VERSION:
+        raise SelectionFileError(f"{file} has unsupported version {version}")
+
+    tags_start = _HEADER.size + name_length
+    points_start = tags_start + count * _TAG_DTYPE.itemsize
+    if len(data) != points_start + count * 3 * _POINT_DTYPE.itemsize:
+        raise SelectionFileError(f"{file} is truncated or corrupted")
+
+    try:
+        document = data[_HEADER.size:tags_start].decode()
+    except UnicodeDecodeError:
+        raise SelectionFileError(f"{file} is truncated or corrupted") from None
+
+    # Arrays share the memory of the read file instead of copying it
+    tags = np.frombuffer(data, dtype = _TAG_DTYPE, count = count, offset = tags_start)
+    points = np.frombuffer(data, dtype = _POINT_DTYPE, count = count * 3, offset = points_start)
+    return Selection(document, tags, points.reshape(-1, 3))
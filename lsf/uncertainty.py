@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+from typing import NamedTuple
+
+from lsf import moments as mom
+from lsf import circle, cylinder, plane, schedule
+from lsf.pointset import PointSet
+from config import config
+
+# Highest power of the coordinates needed by each object and names of its parameters
+_PARAMETERS = {
+    "plane": (2, ("normal_x", "normal_y", "normal_z", "offset")),
+    "line": (2, ("direction_x", "direction_y", "direction_z", "x", "y", "z")),
+    "circle": (3, ("center_x", "center_y", "center_z", "radius")),
+    "cylinder": (4, ("axis_x", "axis_y", "axis_z", "radius"))
+}
+# Number of exactly resampled points processed at once, limits the size of the resampling weights
+_EXACT_CHUNK = 2_000_000
+# Cylinder axes of the resamples are searched in a cone of this many standard errors of the axis fitted to all points
+# to this fraction of the standard error
+_AXIS_CONE = 6
+_AXIS_RESOLUTION = 0.01
+
+
+class Uncertainty(NamedTuple):
+    """Bootstrap estimate of the uncertainty of the parameters of a fitted object"""
+    names: tuple[str, ...]
+    estimate: npt.NDArray  # Parameters fitted to all points
+    samples: npt.NDArray  # Parameters fitted to each resample (rows)
+    covariance: npt.NDArray
+    intervals: npt.NDArray  # Lower and upper percentile bound of each parameter (rows) at the confidence level
+    exact: bool  # Resamples were drawn from the points, otherwise their sums were approximated by a normal distribution
+
+
+def resampled_sums(centered_points: npt.NDArray, order: int, resamples: int, rng: np.random.Generator,
+                   exact: bool) -> npt.NDArray:
+    """
+    Return sums of the distinct products of the coordinates (see moments.monomials) of bootstrap resamples, one row per
+    resample. Exact resampling draws the points of each resample, otherwise the sums are drawn from the normal
+    distribution with the exact mean and covariance of the resampled sums, which they approach for many points.
+    """
+    features = mom.monomials(centered_points, order)
+    count = len(features)
+
+    if exact:
+        chunk = max(_EXACT_CHUNK // count, 1)
+        sums = []
+        for start in range(0, resamples, chunk):
+            size = min(chunk, resamples - start)
+            # Number of times each point is drawn into each resample
+            draws = rng.integers(0, count, (size, count)) + np.arange(size)[:, None] * count
+            weights = np.bincount(draws.ravel(), minlength = size * count).reshape(size, count)
+            sums.append(weights @ features)
+        return np.concatenate(sums)
+
+    # Sum of count points drawn with replacement has count times the mean and covariance of a single draw
+    mean = np.mean(features, axis = 0)
+    deviations = features - mean
+    eigenvalues, eigenvectors = np.linalg.eigh(deviations.T @ deviations)
+    root = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+    return count * mean + rng.standard_normal((resamples, len(mean))) @ root.T
+
+
+def align(vectors: npt.NDArray, reference: npt.NDArray) -> npt.NDArray:
+    """Flip vectors (rows) pointing away from the reference, their orientation is arbitrary"""
+    return vectors * np.where(vectors @ reference < 0, -1, 1)[:, None]
+
+
+def plane_parameters(point_set: PointSet, m: npt.NDArray, m2: npt.NDArray) -> npt.NDArray:
+    """Normal and offset of the planes fitted to resamples with the given means and second moments"""
+    normals = align(np.linalg.eigh(m2)[1][..., 0], point_set.principal_axes[1][:, 0])
+    offsets = np.einsum("ij,ij->i", normals, m + point_set.mean)
+    return np.column_stack((normals, offsets))
+
+
+def line_parameters(point_set: PointSet, m: npt.NDArray, m2: npt.NDArray) -> npt.NDArray:
+    """Direction and centroid of the lines fitted to resamples with the given means and second moments"""
+    directions = align(np.linalg.eigh(m2)[1][..., -1], point_set.principal_axes[1][:, -1])
+    return np.column_stack((directions, m + point_set.mean))
+
+
+def circle_parameters(point_set: PointSet, m: npt.NDArray, m2: npt.NDArray, m3: npt.NDArray) -> npt.NDArray:
+    """Center and radius of the circles fitted to resamples with the given moments"""
+    plane_cs = plane.plane_coordinate_system(np.linalg.eigh(m2)[1][..., 0])
+    c, _ = circle.solve_circle(plane_cs, m2, m3)
+    centers, radii = circle.circle_parameters(plane_cs, c)
+    return np.column_stack((centers + m + point_set.mean, radii))
+
+
+def cylinder_parameters(point_set: PointSet, m2: npt.NDArray, m3: npt.NDArray, m4: npt.NDArray) -> npt.NDArray:
+    """
+    Axis and radius of the cylinders fitted to resamples with the given moments.
+    Axes of all resamples are searched at once in a cone around the axis fitted to all points, sized by its accuracy.
+    """
+    axis, *_ = cylinder.fit_cylinder(point_set)
+    error, r_sqr, _, _ = cylinder.axis_fitter(point_set)(axis)
+    standard_error = max(np.radians(schedule.axis_accuracy(point_set, error, r_sqr, axis)), 1e-9)
+
+    cones = np.full(len(m2), _AXIS_CONE * standard_error)
+    axes, r_sqr, _, _ = cylinder.search_axes(cylinder.axis_rotation(axis), cones, len(point_set),
+                                             *mom.cylinder_moments(m2, m3, m4), _AXIS_RESOLUTION * standard_error)
+    return np.column_stack((align(axes, axis), np.sqrt(r_sqr)))
+
+
+def fit_uncertainty(fitting_object: str, points: npt.ArrayLike | PointSet, resamples: int | None = None,
+                    confidence: float | None = None, exact: bool | None = None, seed: int | None = None) -> Uncertainty:
+    """
+    Estimate uncertainty of the parameters of a fitted object by bootstrapping.
+    All resamples are fitted at once from their stacked moments. By default the number of resamples, confidence level
+    (in percent) and random seed are taken from the uncertainty settings and the resamples are drawn exactly for at most
+    uncertainty.exact_points points, larger point sets get an approximate bootstrap (see resampled_sums).
+    """
+    if fitting_object not in _PARAMETERS:
+        raise ValueError(f"Unknown fitting object '{fitting_object}'")
+    order, names = _PARAMETERS[fitting_object]
+
+    point_set = PointSet.of(points)
+    resamples = config.uncertainty.resamples if resamples is None else resamples
+    confidence = config.uncertainty.confidence if confidence is None else confidence
+    rng = np.random.default_rng(config.uncertainty.seed if seed is None else seed)
+    exact = len(point_set) <= config.uncertainty.exact_points if exact is None else exact
+
+    # First row holds the sums of all points, the rest the sums of the resamples
+    features = mom.monomials(point_set.centered, order)
+    sums = np.vstack((np.sum(features, axis = 0), resampled_sums(point_set.centered, order, resamples, rng, exact)))
+    m, m2, m3, m4 = mom.central_moments(len(point_set), *mom.expand_power_sums(sums, order))
+
+    if fitting_object == "plane":
+        parameters = plane_parameters(point_set, m, m2)
+    elif fitting_object == "line":
+        parameters = line_parameters(point_set, m, m2)
+    elif fitting_object == "circle":
+        parameters = circle_parameters(point_set, m, m2, m3)
+    else:
+        parameters = cylinder_parameters(point_set, m2, m3, m4)
+
+    estimate, samples = parameters[0], parameters[1:]
+    tail = (100 - confidence) / 2
+    intervals = np.percentile(samples, [tail, 100 - tail], axis = 0).T
+
+    return Uncertainty(names, estimate, samples, np.cov(samples, rowvar = False), intervals, exact)
@@ -4,10 +4,9 @@ import tkinter as tk
 import sys
 from typing import Callable
 
-from solidedge import se
-from gui.mainapplication import MainApplication
+from gui import startup
 from gui.tklogging import PopupHandler, StatusHandler
-from config import load_config, lang
+from config import config, load_config, lang, watch_config
 
 
 def setup_popup_logging(logger: logging.Logger) -> None:
@@ -30,6 +29,9 @@ def on_close(root: tk.Tk) -> None:
 
 
 def main() -> None:
+    # Import heavy modules and load Solid Edge type libraries while the window is being created
+    warm_up = startup.start_warm_up()
+
     # Setup logging
     logger = logging.getLogger("LSF")
     logger.setLevel(logging.INFO)
@@ -51,25 +53,30 @@ def main() -> None:
     # Load configuration files
     if not load_config():
         return
+    if config.reload.watch:
+        watch_config(config.reload.interval / 1000)
 
-    # Attempt to connect to SolidEdge
-    success = se.connect()
-    if not success:
-        return
-
-    # Create and configure tkinter window
+    # Show the window right away, its controls are created once Solid Edge is connected
     root.deiconify()
     root.protocol("WM_DELETE_WINDOW", lambda: on_close(root))
     root.title(lang.app.title)
     root.resizable(False, False)
     root.iconbitmap("icon.ico")
+    l_starting = tk.Label(root, text = lang.info.starting, fg = "gray30")
+    l_starting.pack(padx = 48, pady = 24)
+
+    def create_application() -> None:
+        """Replace the start-up message with the application"""
+        from gui.mainapplication import MainApplication
 
-    main_application = MainApplication(root)
-    main_application.pack(fill = "both", expand = True)
+        l_starting.destroy()
+        main_application = MainApplication(root)
+        main_application.pack(fill = "both", expand = True)
 
-    # Info logging
-    setup_status_bar_logging(logger, main_application.set_info_display)
+        # Info logging
+        setup_status_bar_logging(logger, main_application.status.post)
 
+    startup.finish_when_ready(root, warm_up, create_application)
     root.mainloop()
 
 
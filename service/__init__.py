@@ -0,0 +1,3 @@
+# Server is imported from service.server so that clients don't load the fitting modules
+from service.protocol import ProtocolError
+from service.client import FitClient, FitServiceError
@@ -0,0 +1,23 @@
+"""
+Run the fit service keeping the fitting modules loaded between requests.
+Run from the repository root: python -m service
+"""
+import logging
+import sys
+
+from config import load_config
+from service.server import serve
+
+
+def main() -> None:
+    logger = logging.getLogger("LSF")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stderr))
+
+    if not load_config():
+        return
+    serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import socket
+import numpy.typing as npt
+
+from service import protocol
+from config import config
+
+
+class FitServiceError(Exception):
+    """Exception when the fit service fails to fit the requested object"""
+
+
+class FitClient:
+    """Persistent connection to the fit service sending one request at a time"""
+
+    def __init__(self, host: str | None = None, port: int | None = None, timeout: float | None = None) -> None:
+        host = config.service.host if host is None else host
+        port = config.service.port if port is None else port
+        self.connection = socket.create_connection((host, port), timeout = timeout)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def fit(self, fitting_object: str, points: npt.ArrayLike, **options) -> dict:
+        """
+        Fit object ("plane", "cylinder", "line", "circle", "auto" or "segments") to the points. Options are passed to
+        the fitting function. Return the fitted object name, its fitting data and the quality of the fit.
+        """
+        protocol.send_request(self.connection, fitting_object, points, options)
+        status, result = protocol.receive_response(self.connection)
+        if status != protocol.STATUS_OK:
+            raise FitServiceError(result["error"])
+        return result
+
+    def close(self) -> None:
+        """Close the connection"""
+        self.connection.close()
+
+    def __enter__(self) -> FitClient:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
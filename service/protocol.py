@@ -0,0 +1,99 @@
+"""
+Messages of the fit service. Every message starts with a fixed header followed by a JSON document and, for requests,
+the points as little-endian float64 coordinates.
+Request header: magic b"LSFQ", protocol version, length of the JSON document, number of points.
+Response header: magic b"LSFA", protocol version, status (0 on success), length of the JSON document.
+"""
+from __future__ import annotations
+
+import json
+import socket
+import struct
+import numpy as np
+import numpy.typing as npt
+
+VERSION = 1
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_REQUEST = struct.Struct("<4sHIQ")
+_RESPONSE = struct.Struct("<4sHHI")
+_REQUEST_MAGIC = b"LSFQ"
+_RESPONSE_MAGIC = b"LSFA"
+_POINT_DTYPE = np.dtype("<f8")
+
+
+class ProtocolError(Exception):
+    """Exception when a message of the fit service is malformed"""
+
+
+def receive_exactly(connection: socket.socket, size: int) -> None | bytearray:
+    """Read size bytes from the connection, None when it is closed before the first byte"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = connection.recv_into(view[received:])
+        if count == 0:
+            if received == 0:
+                return None
+            raise ProtocolError("Connection closed in the middle of a message")
+        received += count
+    return buffer
+
+
+def send_request(connection: socket.socket, fitting_object: str, points: npt.ArrayLike, options: dict) -> None:
+    """Send request to fit an object to the points with options passed to the fitting function"""
+    points = np.ascontiguousarray(points, dtype = _POINT_DTYPE).reshape(-1, 3)
+    document = json.dumps({"object": fitting_object, "options": options}).encode()
+    connection.sendall(_REQUEST.pack(_REQUEST_MAGIC, VERSION, len(document), len(points)) + document)
+    connection.sendall(memoryview(points).cast("B"))
+
+
+def receive_request(connection: socket.socket, max_size: int | None = None) -> None | tuple[str, npt.NDArray, dict]:
+    """
+    Receive request, return fitted object name, points and options or None when the connection is closed.
+    Requests larger than max_size bytes are rejected before their body is read.
+    """
+    header = receive_exactly(connection, _REQUEST.size)
+    if header is None:
+        return None
+    magic, version, document_length, count = _REQUEST.unpack(header)
+    if magic != _REQUEST_MAGIC or version != VERSION:
+        raise ProtocolError("Unknown request format")
+    size = document_length + count * 3 * _POINT_DTYPE.itemsize
+    if max_size is not None and size > max_size:
+        raise ProtocolError(f"Request of {size} bytes exceeds the limit of {max_size} bytes")
+
+    document = json.loads(_receive_part(connection, document_length))
+    if not isinstance(document, dict) or not isinstance(document.get("options", {}), dict):
+        raise ProtocolError("Request document must be a JSON object with an object of options")
+    points = np.frombuffer(_receive_part(connection, count * 3 * _POINT_DTYPE.itemsize), dtype = _POINT_DTYPE)
+    return document["object"], points.reshape(-1, 3), document.get("options", {})
+
+
+def send_response(connection: socket.socket, status: int, result) -> None:
+    """Send results of a request, the result has to be representable in JSON"""
+    document = json.dumps(result).encode()
+    connection.sendall(_RESPONSE.pack(_RESPONSE_MAGIC, VERSION, status, len(document)) + document)
+
+
+def receive_response(connection: socket.socket) -> tuple[int, object]:
+    """Receive response, return its status and result"""
+    header = receive_exactly(connection, _RESPONSE.size)
+    if header is None:
+        raise ProtocolError("Connection closed before the response")
+    magic, version, status, document_length = _RESPONSE.unpack(header)
+    if magic != _RESPONSE_MAGIC or version != VERSION:
+        raise ProtocolError("Unknown response format")
+    return status, json.loads(_receive_part(connection, document_length))
+
+
+def _receive_part(connection: socket.socket, size: int) -> bytearray:
+    """Read the rest of a message that has already started"""
+    if size == 0:
+        return bytearray()
+    part = receive_exactly(connection, size)
+    if part is None:
+        raise ProtocolError("Connection closed in the middle of a message")
+    return part
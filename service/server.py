@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import socket
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import numpy.typing as npt
+import logging
+
+import lsf
+from service import protocol
+from config import config, lang
+
+logger = logging.getLogger("LSF")
+
+_FITTING_OBJECTS = ("plane", "cylinder", "line", "circle")
+
+
+def to_json(value):
+    """Convert results of the fitting functions to values representable in JSON"""
+    if isinstance(value, lsf.FitReport):
+        # Distances of every point are left out, the summary is enough for the caller
+        return {"rms": value.rms, "max_deviation": value.max_deviation, "objective": value.objective,
+                "percentiles": {str(level): percentile for level, percentile in value.percentiles.items()}}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (tuple, list)):
+        return [to_json(item) for item in value]
+    return value
+
+
+def fit_request(fitting_object: str, points: npt.NDArray, options: dict) -> dict:
+    """
+    Fit object to the points of a request and return the results. Besides the single objects, "auto" fits the object
+    describing the points best and "segments" splits the points into features fitted separately.
+    """
+    # Points are reduced the same way as the selection in the application
+    point_set = lsf.PointSet(points).reduced(config.reduction.merge_tolerance, config.reduction.target_count)
+
+    if fitting_object == "auto":
+        best, _ = lsf.fit_auto(point_set)
+        return {"object": best.fitting_object, "result": to_json(best.fitting_data), "report": to_json(best.report)}
+
+    if fitting_object == "segments":
+        segments = lsf.segment_points(point_set, **options)
+        return {"object": fitting_object,
+                "result": [{"object": segment.fitting_object, "result": to_json(segment.fitting_data),
+                            "rms": segment.rms} for segment in segments]}
+
+    if fitting_object not in _FITTING_OBJECTS:
+        raise ValueError(f"Unknown fitting object '{fitting_object}'")
+    if len(point_set) < lsf.required_points[fitting_object]:
+        raise ValueError(f"Not enough points to fit {fitting_object}")
+
+    fitting_function = getattr(lsf, f"fit_{fitting_object}")
+    *fitting_data, report = fitting_function(point_set, report = True, **options)
+
+    # Plane is returned as a single array, other objects as tuples
+    fitting_data = fitting_data[0] if fitting_object == "plane" else fitting_data
+    return {"object": fitting_object, "result": to_json(fitting_data), "report": to_json(report)}
+
+
+def error_result(exception: Exception) -> dict:
+    """Result of a failed request describing the exception"""
+    return {"error": f"{type(exception).__name__}: {exception}"}
+
+
+class FitRequestHandler(socketserver.BaseRequestHandler):
+    """Answer fit requests of a single connection until the client closes it"""
+
+    def setup(self) -> None:
+        # Responses are small, send them right away
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request = protocol.receive_request(self.request, config.service.max_request_size * 2 ** 20)
+            except OSError:
+                return
+            except (protocol.ProtocolError, ValueError, KeyError) as e:
+                # Rest of the message can't be told apart from the next one, answer and close the connection
+                logger.debug(f"Invalid request from {self.client_address}: {e}")
+                self.send_error(e)
+                return
+            except Exception as e:
+                logger.exception(f"Reading request from {self.client_address} failed")
+                self.send_error(e)
+                return
+            if request is None:
+                return
+
+            # Fits of all connections share the worker pool
+            future = self.server.executor.submit(fit_request, *request)
+            try:
+                status, result = protocol.STATUS_OK, future.result()
+            except Exception as e:
+                logger.debug(f"Request from {self.client_address} failed: {e}")
+                status, result = protocol.STATUS_ERROR, error_result(e)
+
+            try:
+                protocol.send_response(self.request, status, result)
+            except OSError:
+                return
+
+    def send_error(self, exception: Exception) -> None:
+        """Answer the current request by an error, the connection may already be broken"""
+        try:
+            protocol.send_response(self.request, protocol.STATUS_ERROR, error_result(exception))
+        except OSError:
+            pass
+
+
+class FitServer(socketserver.ThreadingTCPServer):
+    """
+    Local server fitting objects to points sent over TCP. Each connection is read by its own thread while the fits run
+    in a shared pool of worker threads. The fitting modules, configuration and fit cache stay loaded between requests.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], workers: int) -> None:
+        self.executor = ThreadPoolExecutor(max_workers = workers)
+        super().__init__(address, FitRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait = False, cancel_futures = True)
+
+
+def serve(host: str | None = None, port: int | None = None, workers: int | None = None) -> None:
+    """Run the fit service until interrupted. By default the address and worker count come from service settings"""
+    host = config.service.host if host is None else host
+    port = config.service.port if port is None else port
+    workers = config.service.workers if workers is None else workers
+
+    with FitServer((host, port), workers) as server:
+        logger.info(lang.info.service_started.format(host = host, port = server.server_address[1], workers = workers))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
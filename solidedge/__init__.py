@@ -4,3 +4,4 @@ from solidedge.plane import construct_plane
 from solidedge.cylinder import construct_cylinder
 from solidedge.line import construct_line
 from solidedge.circle import construct_circle
+from solidedge.bulk import construct_objects
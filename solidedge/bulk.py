@@ -0,0 +1,44 @@
+import logging
+
+import solidedge.seconnect as se
+from solidedge.plane import add_plane
+from solidedge.cylinder import add_cylinder
+from solidedge.line import add_line
+from solidedge.circle import add_circle
+from config import lang
+
+logger = logging.getLogger("LSF")
+
+_ADD_FUNCTIONS = {
+    "plane": add_plane,
+    "cylinder": add_cylinder,
+    "line": add_line,
+    "circle": add_circle
+}
+
+
+def construct_objects(objects: list[tuple[str, object]]) -> None:
+    """
+    Construct many fitted objects, given as pairs of the object name and its fitting data, in one go.
+    Screen updates and recomputes of the document are suspended until all objects are added.
+    """
+    logger.info(lang.info.segments_construction.format(count = len(objects)))
+
+    doc = se.get_active_document()
+    if doc is None:
+        return
+
+    screen_updating = se.app.ScreenUpdating
+    delay_compute = se.app.DelayCompute
+    se.app.ScreenUpdating = False
+    se.app.DelayCompute = True
+    try:
+        for fitting_object, fitting_data in objects:
+            add_function = _ADD_FUNCTIONS[fitting_object]
+            if isinstance(fitting_data, tuple):
+                add_function(doc, *fitting_data)
+            else:
+                add_function(doc, fitting_data)
+    finally:
+        se.app.DelayCompute = delay_compute
+        se.app.ScreenUpdating = screen_updating
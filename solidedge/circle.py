@@ -15,6 +15,11 @@ def construct_circle(normal: npt.ArrayLike, center: npt.ArrayLike, r):
     doc = se.get_active_document()
     if doc is None:
         return
+    add_circle(doc, normal, center, r)
+
+
+def add_circle(doc, normal: npt.ArrayLike, center: npt.ArrayLike, r) -> None:
+    """Add a circle in 3D to the document"""
     sketches_3d = doc.Sketches3D
 
     # Draw circle
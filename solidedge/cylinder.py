@@ -15,7 +15,11 @@ def construct_cylinder(direction: npt.ArrayLike, radius: float, origin: npt.Arra
     doc = se.get_active_document()
     if doc is None:
         return
+    add_cylinder(doc, direction, radius, origin, length)
 
+
+def add_cylinder(doc, direction: npt.ArrayLike, radius: float, origin: npt.ArrayLike, length: float) -> None:
+    """Add a cylinder at specific point and orientation in space to the document"""
     constructions = doc.Constructions
     ref_planes = doc.RefPlanes
 
@@ -15,6 +15,11 @@ def construct_line(start_point: npt.ArrayLike, end_point: npt.ArrayLike) -> None
     doc = se.get_active_document()
     if doc is None:
         return
+    add_line(doc, start_point, end_point)
+
+
+def add_line(doc, start_point: npt.ArrayLike, end_point: npt.ArrayLike) -> None:
+    """Add a line between two points to the document"""
     sketches_3d = doc.Sketches3D
 
     # Draw line
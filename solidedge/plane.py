@@ -15,7 +15,11 @@ def construct_plane(bounding_points: npt.ArrayLike) -> None:
     doc = se.get_active_document()
     if doc is None:
         return
+    add_plane(doc, bounding_points)
 
+
+def add_plane(doc, bounding_points: npt.ArrayLike) -> None:
+    """Add a plane given by its bounding points to the document"""
     constructions = doc.Constructions
     blue_surfs = constructions.BlueSurfs
     sketches_3d = doc.Sketches3D
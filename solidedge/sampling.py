@@ -0,0 +1,53 @@
+"""
+Sampling points on edges and faces. Parameters of all samples of an entity are generated at once and evaluated by a
+single call of its GetPointAtParam instead of calling Solid Edge for every point.
+"""
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from config import config
+
+
+def edge_parameters(min_param: float, max_param: float, count: int) -> npt.NDArray:
+    """Parameters splitting the range into count equal parts, one in the middle of each part"""
+    return min_param + (np.arange(count) + 0.5) * ((max_param - min_param) / count)
+
+
+def face_parameters(min_params: npt.ArrayLike, max_params: npt.ArrayLike, count: int) -> npt.NDArray:
+    """
+    Parameters (u, v) of a grid of at least count points covering the parameter rectangle, one in the middle of each
+    cell so that periodic faces don't get the seam twice
+    """
+    side = int(np.ceil(np.sqrt(count)))
+    u = edge_parameters(min_params[0], max_params[0], side)
+    v = edge_parameters(min_params[1], max_params[1], side)
+    return np.stack(np.meshgrid(u, v, indexing = "ij"), axis = -1).reshape(-1, 2)
+
+
+def sample_edge(edge, count: int | None = None) -> npt.NDArray:
+    """Return count points (sampling.edge_points by default) evenly spread over the parameter range of the edge"""
+    count = config.sampling.edge_points if count is None else count
+    min_param, max_param = edge.GetParamExtents(0.0, 0.0)
+    params = edge_parameters(min_param, max_param, count)
+    points = edge.GetPointAtParam(count, tuple(params), tuple())
+    return np.array(points, dtype = float).reshape(-1, 3)
+
+
+def sample_face(face, count: int | None = None) -> npt.NDArray:
+    """
+    Return points of a grid of about count points (sampling.face_points by default) over the parameter range of the
+    face. Grid points outside the face boundary, e.g. in holes of a trimmed face, are left out.
+    """
+    count = config.sampling.face_points if count is None else count
+    min_params, max_params = face.GetParamRange(tuple(), tuple())
+    params = face_parameters(min_params, max_params, count)
+
+    on_face = np.array(face.IsParamOnFace(len(params), tuple(params.ravel()), tuple()), dtype = bool)
+    params = params[on_face]
+    if not len(params):
+        return np.empty((0, 3))
+
+    points = face.GetPointAtParam(len(params), tuple(params.ravel()), tuple())
+    return np.array(points, dtype = float).reshape(-1, 3)
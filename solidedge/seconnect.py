@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import pythoncom
 import win32com.client
 # noinspection PyUnresolvedReferences
 from pywintypes import com_error
@@ -10,29 +11,42 @@ from solidedge.comwrapper import COMWrapper
 
 logger = logging.getLogger("LSF")
 
-constants: COMWrapper
-geometry: COMWrapper
+constants: None | COMWrapper = None
+geometry: None | COMWrapper = None
 
 app: COMWrapper
 
 
+def load_type_libraries() -> None:
+    """
+    Load Python wrappers of the Solid Edge type libraries, generating them the first time, which is slow.
+    It doesn't touch the running Solid Edge so it may be called from any thread ahead of connecting.
+    """
+    global constants, geometry
+    # Each thread using COM has to initialize it, initializing it again is harmless
+    pythoncom.CoInitialize()
+    constants = COMWrapper(
+        win32com.client.gencache.EnsureModule("{C467A6F5-27ED-11D2-BE30-080036B4D502}", 0, 1, 0).constants)
+    geometry = COMWrapper(win32com.client.gencache.EnsureModule('{3E2B3BE1-F0B9-11D1-BDFD-080036B4D502}', 0, 1, 0))
+
+
 def connect() -> bool:
-    """Attempt to connect to SolidEdge instance"""
-    global app, constants, geometry
+    """Attempt to connect to SolidEdge instance, type libraries are loaded first unless they already are"""
+    global app
     try:
-        constants = win32com.client.gencache.EnsureModule("{C467A6F5-27ED-11D2-BE30-080036B4D502}", 0, 1, 0).constants
-        geometry = win32com.client.gencache.EnsureModule('{3E2B3BE1-F0B9-11D1-BDFD-080036B4D502}', 0, 1, 0)
-        app = win32com.client.GetActiveObject("SolidEdge.Application")
+        if constants is None or geometry is None:
+            load_type_libraries()
 
-        # Wrap COM objects
-        constants = COMWrapper(constants)
-        geometry = COMWrapper(geometry)
-        app = COMWrapper(app)
+        # Type libraries may have been loaded by another thread, Solid Edge objects belong to the connecting thread
+        pythoncom.CoInitialize()
+        app = COMWrapper(win32com.client.GetActiveObject("SolidEdge.Application"))
 
-    except Exception as e:
-        print(e)
+    except com_error:
         logger.error(lang.errors.se_not_running)
         return False
+    except Exception as e:
+        logger.exception(lang.errors.startup_failed.format(error = e))
+        return False
     return True
 
 
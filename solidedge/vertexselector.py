@@ -8,6 +8,8 @@ import win32gui  # noqa
 from pywintypes import com_error  # noqa
 
 from solidedge import se
+from solidedge.sampling import sample_edge, sample_face
+from lsf import Moments, Selection, save_selection
 from config import lang
 
 logger = logging.getLogger("LSF")
@@ -21,7 +23,16 @@ class VertexSelector:
     """Class for handling Solid Edge mouse events allowing the user to select 3D points"""
 
     def __init__(self) -> None:
+        # Selected vertices, or edges and faces when sampling, and their coordinates (one row per sample) by tag
         self.vertices = {}
+        self.coordinates: dict[int, npt.NDArray] = {}
+        self.sampling = False
+        self.moments = Moments()
+        self.version = 0
+        # Axis of the last cylinder fitted to the selection, refits of the changed selection start from it
+        self.cylinder_axis: None | npt.NDArray = None
+        # Document a restored selection was made in when it isn't the working one, its tags don't belong here
+        self.foreign_document: None | str = None
         self.start_drag: None | tuple[float, float] = None
         self.end_drag: None | tuple[float, float] = None
 
@@ -29,6 +40,7 @@ class VertexSelector:
         self.window = None
         self.view = None
         self.highlight_set = None
+        self.outlier_set = None
         self.command = None
         self.mouse = None
 
@@ -46,6 +58,7 @@ class VertexSelector:
         if not self.create_command(clear_data = False):
             return
         self.highlight_all()
+        self.update_coordinates()
 
         logger.info(lang.info.selector_continue)
 
@@ -60,6 +73,7 @@ class VertexSelector:
         self.window = None
         self.view = None
         self.highlight_set = None
+        self.outlier_set = None
         self.command = None
         self.mouse = None
 
@@ -80,6 +94,8 @@ class VertexSelector:
 
         self.highlight_set = self.doc.HighlightSets.Add()
         self.highlight_set.Color = rgb_to_int(0, 127, 0)
+        self.outlier_set = self.doc.HighlightSets.Add()
+        self.outlier_set.Color = rgb_to_int(255, 0, 0)
 
         self.command = se.app.CreateCommand(se.constants.seNoDeactivate)
         self.command.Start()
@@ -89,12 +105,26 @@ class VertexSelector:
         self.mouse.EnabledDrag = True
         self.mouse.ScaleMode = 0
         self.mouse.WindowTypes = 1
-        self.mouse.AddToLocateFilter(se.constants.seLocatePoint)
+        self.update_locate_filter()
 
         self.register_events()
 
         return True
 
+    def set_sampling(self, sampling: bool) -> None:
+        """Select edges and faces sampled by many points in addition to vertices or select vertices only"""
+        self.sampling = sampling
+        if self.mouse is not None:
+            self.update_locate_filter()
+
+    def update_locate_filter(self) -> None:
+        """Let the mouse locate the entities selected in the current mode"""
+        self.mouse.ClearLocateFilter()
+        self.mouse.AddToLocateFilter(se.constants.seLocatePoint)
+        if self.sampling:
+            self.mouse.AddToLocateFilter(se.constants.seLocateEdge)
+            self.mouse.AddToLocateFilter(se.constants.seLocateFace)
+
     def register_events(self) -> None:
         """Register the necessary Solid Edge events.
         MouseEvents is defined within the function to allow access to a VertexSelector instance"""
@@ -178,6 +208,32 @@ class VertexSelector:
 
         return visible_vertices
 
+    @staticmethod
+    def get_body_edges_and_faces(model) -> list:
+        """Return all edges and faces of a model"""
+        entities = []
+        try:
+            body = model.Body
+            if body.Visible:
+                edges = body.Edges(se.constants.igQueryAll)
+                entities += [se.geometry.Edge(edges.Item(i)) for i in range(1, edges.Count + 1)]
+                faces = body.Faces(se.constants.igQueryAll)
+                entities += [se.geometry.Face(faces.Item(i)) for i in range(1, faces.Count + 1)]
+        # When bodies are united/stitched they may not be accessible though they are listed/counted
+        except Exception as e:
+            logger.debug(f"Edges and faces of a body aren't accessible: {e}")
+
+        return entities
+
+    def get_visible_edges_and_faces(self) -> list:
+        """Get all edges and faces of the design and construction bodies of a document"""
+        visible_entities = []
+        for bodies in (self.doc.Models, self.doc.Constructions):
+            for i in range(1, bodies.Count + 1):
+                visible_entities += self.get_body_edges_and_faces(bodies.Item(i))
+
+        return visible_entities
+
     def mouse_down(self, button, modifier, _dx, _dy, _dz, _p_window_dispatch, _l_key_point_type,
                    p_graphic_dispatch) -> None:
         """Process MouseDown event. If clicked on a vertex, add it to the selected vertices"""
@@ -185,6 +241,9 @@ class VertexSelector:
             return
         if p_graphic_dispatch is None:
             return
+        if self.foreign_document is not None:
+            logger.error(lang.errors.selection_foreign)
+            return
 
         self.process_vertex(p_graphic_dispatch, modifier)
 
@@ -200,6 +259,9 @@ class VertexSelector:
         if drag_state == 0:
             self.start_drag = (dx, dy)
         elif drag_state == 2:
+            if self.foreign_document is not None:
+                logger.error(lang.errors.selection_foreign)
+                return
             self.end_drag = (dx, dy)
             vertices = self.fence_select()
             for vertex in vertices:
@@ -220,20 +282,57 @@ class VertexSelector:
         return vertices
 
     def process_vertex(self, vertex, modifier) -> None:
-        """Determine what should be done with the selected vertex based on the modifier key held"""
-        vertex = se.geometry.Vertex(vertex)
+        """Determine what should be done with the selected vertex, edge or face based on the modifier key held"""
+        # Tags of the working document could collide with the tags of a selection restored from another one
+        if self.foreign_document is not None:
+            return
+        vertex = self.wrap_entity(vertex)
 
         if modifier == 2:  # CTRL
             self.remove_vertex(vertex)
         else:
             self.add_vertex(vertex)
 
+    @staticmethod
+    def wrap_entity(entity):
+        """Wrap located entity in the geometry interface of its type"""
+        entity_type = entity.Type
+        if entity_type == se.constants.igEdge:
+            return se.geometry.Edge(entity)
+        if entity_type == se.constants.igFace:
+            return se.geometry.Face(entity)
+        return se.geometry.Vertex(entity)
+
+    @staticmethod
+    def entity_points(entity) -> npt.NDArray:
+        """Coordinates of a vertex or samples of an edge or face, one row per sample"""
+        entity_type = entity.Type
+        if entity_type == se.constants.igEdge:
+            return sample_edge(entity)
+        if entity_type == se.constants.igFace:
+            return sample_face(entity)
+        return np.array(entity.GetPointData(tuple()))
+
     def add_vertex(self, vertex) -> None:
         """Highlight the selected vertex"""
         if vertex.Tag in self.vertices:
             return
 
+        # Restored vertex that wasn't found when restoring the selection is already counted
+        if vertex.Tag in self.coordinates:
+            self.vertices[vertex.Tag] = vertex
+            self.highlight_set.AddItem(vertex)
+            self.highlight_set.Draw()
+            return
+
+        coordinates = self.entity_points(vertex)
+        if coordinates.size == 0:
+            return
         self.vertices[vertex.Tag] = vertex
+        self.coordinates[vertex.Tag] = coordinates
+        self.moments.add(coordinates)
+        self.version += 1
+
         self.highlight_set.AddItem(vertex)
         self.highlight_set.Draw()
 
@@ -246,10 +345,17 @@ class VertexSelector:
         self.highlight_set.RemoveItem(index)
         self.highlight_set.Draw()
         del self.vertices[vertex.Tag]
+        self.moments.remove(self.coordinates.pop(vertex.Tag))
+        self.version += 1
 
     def clear(self) -> None:
         """Clear selected vertices"""
         self.vertices.clear()
+        self.coordinates.clear()
+        self.moments.clear()
+        self.version += 1
+        self.cylinder_axis = None
+        self.foreign_document = None
         self.clear_highlight()
 
     def highlight_all(self) -> None:
@@ -266,6 +372,21 @@ class VertexSelector:
         if self.highlight_set is not None:
             self.highlight_set.RemoveAll()
             self.highlight_set.Draw()
+        if self.outlier_set is not None:
+            self.outlier_set.RemoveAll()
+            self.outlier_set.Draw()
+
+    def highlight_outliers(self, tags: list) -> None:
+        """Highlight selected vertices with given tags as outliers, replacing previously highlighted outliers"""
+        if self.outlier_set is None:
+            return
+
+        self.outlier_set.RemoveAll()
+        # Samples of one edge or face share its tag
+        for tag in dict.fromkeys(tags):
+            if tag in self.vertices:
+                self.outlier_set.AddItem(self.vertices[tag])
+        self.outlier_set.Draw()
 
     def get_coordinates(self) -> npt.NDArray | None:
         """Get 3D coordinates of the selected vertices"""
@@ -278,10 +399,77 @@ class VertexSelector:
         if not self.working_document_is_active_document(active_document):
             return np.array([])
 
-        points = [vertex.GetPointData(tuple()) for vertex in self.vertices.values()]
-        return np.array(points)
+        return self.snapshot()[1]
+
+    def get_moments(self) -> Moments:
+        """Get a copy of the running moments of the selected vertices"""
+        return self.moments.copy()
+
+    def update_coordinates(self) -> None:
+        """Reload coordinates of the selected vertices in case the model changed and recalculate their moments"""
+        # Restored vertices missing from the model keep their saved coordinates
+        self.coordinates = {tag: self.entity_points(self.vertices[tag]) if tag in self.vertices else coordinates
+                            for tag, coordinates in self.coordinates.items()}
+        self.moments = Moments.from_points(self.snapshot()[1])
+        self.version += 1
+
+    def snapshot(self) -> tuple[list, npt.NDArray, Moments]:
+        """
+        Get tags, coordinates and moments of the selected vertices without calling Solid Edge.
+        Every sample of an edge or face gets its tag.
+        """
+        if not self.coordinates:
+            return [], np.empty((0, 3)), self.moments.copy()
+        coordinates = [item.reshape(-1, 3) for item in self.coordinates.values()]
+        tags = np.repeat(list(self.coordinates), [len(item) for item in coordinates]).tolist()
+        return tags, np.concatenate(coordinates), self.moments.copy()
+
+    def save(self, file: str) -> None:
+        """Save the selected vertices to a file under the name of the document their tags belong to"""
+        tags, points, _ = self.snapshot()
+        document = self.doc.FullName if self.foreign_document is None else self.foreign_document
+        save_selection(file, document, tags, points)
+
+    def restore(self, selection: Selection) -> bool:
+        """
+        Start a new selection holding saved vertices. Their coordinates are taken from the selection. Vertices, edges
+        and faces with the saved tags are highlighted when the active document is the one they were selected in,
+        a selection restored in another document can't be extended.
+        Sampled edges and faces keep their saved samples.
+        Return success of starting the selection.
+        """
+        if not self.create_command(clear_data = True):
+            return False
+
+        # Samples of one edge or face share its tag, group them by a single stable sort in order of the first sample
+        tags, first, inverse, counts = np.unique(selection.tags, return_index = True, return_inverse = True,
+                                                 return_counts = True)
+        groups = np.split(selection.points[np.argsort(inverse, kind = "stable")], np.cumsum(counts)[:-1])
+        order = np.argsort(first)
+        tags = tags[order].tolist()
+        self.coordinates = {tag: groups[i] if counts[i] > 1 else groups[i][0] for tag, i in zip(tags, order)}
+        self.moments = Moments.from_points(selection.points)
+        self.version += 1
+
+        if self.doc.FullName != selection.document:
+            self.foreign_document = selection.document
+        else:
+            wanted = set(tags)
+            found = {}
+            for vertex in self.get_visible_vertices():
+                vertex = se.geometry.Vertex(vertex)
+                if vertex.Tag in wanted:
+                    found[vertex.Tag] = vertex
+            # Edges and faces are only searched when the selection holds more than vertices, there are many of them
+            if len(found) < len(wanted):
+                for entity in self.get_visible_edges_and_faces():
+                    if entity.Tag in wanted:
+                        found[entity.Tag] = entity
+            self.vertices = {tag: found[tag] for tag in tags if tag in found}
+            self.highlight_all()
+        return True
 
     @property
     def count(self) -> int:
-        """Return number of selected vertices"""
-        return len(self.vertices)
+        """Return number of selected points, each sample of an edge or face counts"""
+        return self.moments.count